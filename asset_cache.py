@@ -0,0 +1,36 @@
+import pygame
+
+# ----------------------
+# Image cache
+# ----------------------
+# Every image is loaded, converted to the display format and scaled once,
+# then handed out from here. Keys include the target size, so the same file
+# used at several resolutions gets one cached surface per size.
+# Images must be requested after pygame.display.set_mode().
+
+_images = {}
+
+
+def load_image(path, size=None, alpha=False):
+    """
+    Return the image at path converted for fast blitting and scaled to size
+    (a (w, h) tuple, or None to keep the original size).
+    alpha=True keeps per-pixel transparency (convert_alpha).
+    The returned surface is shared, so draw on a copy if it must change.
+    """
+    key = (path, tuple(size) if size else None, alpha)
+    image = _images.get(key)
+    if image is None:
+        image = pygame.image.load(path)
+        image = image.convert_alpha() if alpha else image.convert()
+        if size:
+            image = pygame.transform.scale(image, size)
+        _images[key] = image
+    return image
+
+
+def clear():
+    """
+    Drop all cached images, e.g. after the display mode changes.
+    """
+    _images.clear()
@@ -0,0 +1,213 @@
+"""
+Cave generation benchmark.
+
+Times each generation stage (generate_cave as a whole, then place_gates,
+find_farthest_cell and rearrange_gates on their own) for the level presets
+and for synthetic world sizes, over many seeds. Reports mean and
+percentile timings plus peak memory, can save the results as JSON and
+compare two saved runs.
+
+    python bench.py
+    python bench.py --sizes 500x500 1000x1000 --seeds 5 --save after.json
+    python bench.py --compare before.json after.json
+"""
+import argparse
+import json
+import platform
+import random
+import statistics
+import time
+import tracemalloc
+
+from cave import (
+    generate_cave, place_gates, find_farthest_cell, rearrange_gates,
+    FLOOR, EXIT, GATE_CLOSED, GATE_OPEN,
+)
+from grid import first_cell_of
+from levels import LEVELS, LEVEL_PRESETS, DENSITY, MIN_ROOM_SIZE, MAX_ROOM_SIZE
+
+STAGES = ["generate_cave", "place_gates", "find_farthest_cell", "rearrange_gates"]
+
+
+# ----------------------
+# Workloads
+# ----------------------
+def preset_params(level):
+    preset = LEVEL_PRESETS[level]
+    return {
+        "rows": preset["WORLD_ROWS"],
+        "cols": preset["WORLD_COLS"],
+        "num_maps": preset["MAP_NUM"],
+        "num_foods": preset["FOOD_NUM"],
+        "num_lights": preset["LIGHT_NUM"],
+        "num_gates": preset["GATE_NUM"],
+    }
+
+
+def synthetic_params(rows, cols):
+    """
+    A world of the given size with item and gate counts scaled from the
+    hardest preset by area.
+    """
+    base = preset_params(LEVELS[-1])
+    scale = (rows * cols) / (base["rows"] * base["cols"])
+    params = {key: max(1, round(value * scale)) for key, value in base.items()}
+    params["rows"], params["cols"] = rows, cols
+    return params
+
+
+def make_cave(params, seed):
+    return generate_cave(
+        params["rows"], params["cols"], DENSITY, MIN_ROOM_SIZE, MAX_ROOM_SIZE,
+        params["num_maps"], params["num_foods"], params["num_lights"], params["num_gates"],
+        seed=seed
+    )
+
+
+def stage_calls(params, seed):
+    """
+    Yield (stage, callable) pairs for one seed. Every stage after
+    generate_cave works on the cave generated in the first one.
+    """
+    state = {}
+
+    def run_generate():
+        state["cave"], state["spawn"] = make_cave(params, seed)
+        state["exit"] = first_cell_of(state["cave"], EXIT)
+
+    def run_place_gates():
+        cave = state["cave"].copy()
+        cave[(cave == GATE_CLOSED) | (cave == GATE_OPEN)] = FLOOR
+        place_gates(cave, state["spawn"], state["exit"], params["num_gates"],
+                    rng=random.Random(seed))
+
+    def run_find_farthest():
+        find_farthest_cell(state["cave"], *state["spawn"])
+
+    def run_rearrange():
+        rearrange_gates(state["cave"].copy(), state["spawn"], state["exit"],
+                        rng=random.Random(seed))
+
+    yield "generate_cave", run_generate
+    yield "place_gates", run_place_gates
+    yield "find_farthest_cell", run_find_farthest
+    yield "rearrange_gates", run_rearrange
+
+
+# ----------------------
+# Measurement
+# ----------------------
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def summarize(samples):
+    return {
+        "mean_ms": statistics.fmean(samples) * 1000,
+        "p50_ms": percentile(samples, 50) * 1000,
+        "p90_ms": percentile(samples, 90) * 1000,
+        "p99_ms": percentile(samples, 99) * 1000,
+        "max_ms": max(samples) * 1000,
+    }
+
+
+def bench_workload(params, seeds, first_seed=0):
+    times = {stage: [] for stage in STAGES}
+    for seed in range(first_seed, first_seed + seeds):
+        for stage, call in stage_calls(params, seed):
+            start = time.perf_counter()
+            call()
+            times[stage].append(time.perf_counter() - start)
+
+    # Peak memory is measured in a separate pass: tracing slows the code
+    # down too much to be mixed with the timings.
+    peaks = {}
+    for stage, call in stage_calls(params, first_seed):
+        tracemalloc.start()
+        call()
+        peaks[stage] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    return {
+        stage: dict(summarize(times[stage]), peak_kib=peaks[stage] / 1024)
+        for stage in STAGES
+    }
+
+
+def run(presets, sizes, seeds):
+    workloads = [(level, preset_params(level)) for level in presets]
+    for rows, cols in sizes:
+        workloads.append((f"{rows}x{cols}", synthetic_params(rows, cols)))
+
+    results = {
+        "meta": {
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "seeds": seeds,
+        },
+        "workloads": {},
+    }
+    for name, params in workloads:
+        results["workloads"][name] = bench_workload(params, seeds)
+        print_workload(name, results["workloads"][name])
+    return results
+
+
+# ----------------------
+# Reporting
+# ----------------------
+def print_workload(name, stages):
+    print(f"\n{name}")
+    print(f"  {'stage':<20}{'mean':>10}{'p50':>10}{'p90':>10}{'p99':>10}{'peak KiB':>12}")
+    for stage in STAGES:
+        s = stages[stage]
+        print(f"  {stage:<20}{s['mean_ms']:>10.2f}{s['p50_ms']:>10.2f}"
+              f"{s['p90_ms']:>10.2f}{s['p99_ms']:>10.2f}{s['peak_kib']:>12.1f}")
+
+
+def compare(before, after):
+    """
+    Print the p50 time and peak memory of two saved runs side by side.
+    """
+    for name, stages in after["workloads"].items():
+        if name not in before["workloads"]:
+            continue
+        print(f"\n{name}")
+        print(f"  {'stage':<20}{'p50 before':>12}{'p50 after':>12}{'speedup':>10}{'mem ratio':>11}")
+        for stage in STAGES:
+            old, new = before["workloads"][name][stage], stages[stage]
+            speedup = old["p50_ms"] / new["p50_ms"] if new["p50_ms"] else float("inf")
+            mem = new["peak_kib"] / old["peak_kib"] if old["peak_kib"] else float("inf")
+            print(f"  {stage:<20}{old['p50_ms']:>12.2f}{new['p50_ms']:>12.2f}"
+                  f"{speedup:>9.2f}x{mem:>10.2f}x")
+
+
+def parse_size(text):
+    rows, cols = text.lower().split("x")
+    return int(rows), int(cols)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark cave generation stages.")
+    parser.add_argument("--presets", nargs="*", choices=LEVELS, default=LEVELS)
+    parser.add_argument("--sizes", nargs="*", type=parse_size, default=[],
+                        help="synthetic worlds as ROWSxCOLS, e.g. 1000x1000")
+    parser.add_argument("--seeds", type=int, default=20, help="seeds per workload")
+    parser.add_argument("--save", help="write results to this JSON file")
+    parser.add_argument("--compare", nargs=2, metavar=("BEFORE", "AFTER"),
+                        help="compare two saved JSON runs instead of benchmarking")
+    args = parser.parse_args()
+
+    if args.compare:
+        with open(args.compare[0]) as f:
+            before = json.load(f)
+        with open(args.compare[1]) as f:
+            after = json.load(f)
+        compare(before, after)
+    else:
+        results = run(args.presets, args.sizes, args.seeds)
+        if args.save:
+            with open(args.save, "w") as f:
+                json.dump(results, f, indent=2)
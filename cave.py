@@ -1,6 +1,11 @@
 import random
-from collections import deque
-import math
+from array import array
+
+import numpy as np
+
+from grid import new_grid, grid_size, cells_of
+from gridsearch import grid_search, UNREACHED, UP, RIGHT, DOWN, LEFT
+from spatial import SpatialHash
 
 # ----------------------
 # Tile definitions
@@ -20,6 +25,18 @@ LEFT_BORDER = 5
 RIGHT_BORDER = 5
 
 
+def make_rng(seed=None, rng=None):
+    """
+    Pick the random source for a generator: rng if given, else a new
+    random.Random(seed), else the global random module.
+    """
+    if rng is not None:
+        return rng
+    if seed is not None:
+        return random.Random(seed)
+    return random
+
+
 def generate_cave(rows, cols,
                   room_density=0.015,   # room generation density
                   min_room_size=3,
@@ -27,21 +44,62 @@ def generate_cave(rows, cols,
                   num_maps=5,           # number of maps to scatter
                   num_foods=10,         # number of foods to scatter
                   num_lights=8,         # number of lights to scatter
-                  num_gates=6):         # total number of gates (half open, half closed)
-
-    cave = [[WALL for _ in range(cols)] for _ in range(rows)]
+                  num_gates=6,          # total number of gates (half open, half closed)
+                  seed=None,            # same seed -> same cave
+                  rng=None):            # random.Random to draw from (overrides seed)
+    """
+    Generate a cave and return (cave, spawn).
+    All randomness comes from rng; when it is not given, a Random seeded
+    with seed is used, or the global random module if seed is None too.
+    """
+    rng = make_rng(seed, rng)
 
     min_x = LEFT_BORDER
     max_x = cols - RIGHT_BORDER - 1
     min_y = TOP_BORDER
     max_y = rows - BOTTOM_BORDER - 1
 
+    cave, (start_x, start_y) = carve_maze(rows, cols, min_x, max_x, min_y, max_y, rng)
+    rooms = carve_rooms(cave, int(rows * cols * room_density), min_room_size, max_room_size,
+                        min_x, max_x, min_y, max_y, rng)
+
     # ----------------------
-    # Maze generation (iterative DFS)
+    # Spawn & exit
     # ----------------------
+    if rooms:
+        spawn_x, spawn_y = room_center(rooms[0])
+    else:
+        spawn_x, spawn_y = start_x, start_y
+
+    exit_x, exit_y = find_farthest_cell(cave, spawn_x, spawn_y)
+    cave[exit_y, exit_x] = EXIT
+
+    scatter_items(cave, num_maps, num_foods, num_lights, rng)
+
+    # ----------------------
+    # Place gates in narrow passages
+    # ----------------------
+    place_gates(cave, spawn=(spawn_x, spawn_y), exit_pos=(exit_x, exit_y), total_gates=num_gates, rng=rng)
+
+    return cave, (spawn_x, spawn_y)
+
+
+# ----------------------
+# Maze generation (iterative DFS)
+# ----------------------
+def carve_maze(rows, cols, min_x, max_x, min_y, max_y, rng):
+    """
+    Return (cave, start): a rows x cols grid of walls with a maze carved
+    between min and max (inclusive), and the cell the maze started from.
+    Maze cells sit on odd coordinates.
+    """
+    # The DFS is inherently cell-by-cell, so it carves into a flat bytearray
+    # (cheapest per-cell access in Python) which then becomes the grid.
+    cells = bytearray([WALL]) * (rows * cols)
+
     start_x = min_x | 1
     start_y = min_y | 1
-    cave[start_y][start_x] = FLOOR
+    cells[start_y * cols + start_x] = FLOOR
     
     stack = [(start_x, start_y)]
     
@@ -49,15 +107,15 @@ def generate_cave(rows, cols,
         x, y = stack[-1]
         
         directions = [(2, 0), (-2, 0), (0, 2), (0, -2)]
-        random.shuffle(directions)
+        rng.shuffle(directions)
         
         found = False
         for dx, dy in directions:
             nx, ny = x + dx, y + dy
             if min_x <= nx <= max_x and min_y <= ny <= max_y:
-                if cave[ny][nx] == WALL:
-                    cave[y + dy // 2][x + dx // 2] = FLOOR
-                    cave[ny][nx] = FLOOR
+                if cells[ny * cols + nx] == WALL:
+                    cells[(y + dy // 2) * cols + x + dx // 2] = FLOOR
+                    cells[ny * cols + nx] = FLOOR
                     stack.append((nx, ny))
                     found = True
                     break
@@ -65,155 +123,214 @@ def generate_cave(rows, cols,
         if not found:
             stack.pop()
 
-    # ----------------------
-    # Rooms
-    # ----------------------
-    rooms = []
+    cave = new_grid(rows, cols, WALL)
+    cave.flat[:] = cells
+    return cave, (start_x, start_y)
+
+
+# ----------------------
+# Rooms
+# ----------------------
+def rooms_intersect(r1, r2):
+    x1, y1, w1, h1 = r1
+    x2, y2, w2, h2 = r2
+    return not (
+        x1 + w1 + 1 < x2 or
+        x2 + w2 + 1 < x1 or
+        y1 + h1 + 1 < y2 or
+        y2 + h2 + 1 < y1
+    )
 
-    def carve_room(x, y, w, h):
-        for iy in range(y, y + h):
-            for ix in range(x, x + w):
-                cave[iy][ix] = FLOOR
 
-    def intersects(r1, r2):
-        x1, y1, w1, h1 = r1
-        x2, y2, w2, h2 = r2
-        return not (
-            x1 + w1 + 1 < x2 or
-            x2 + w2 + 1 < x1 or
-            y1 + h1 + 1 < y2 or
-            y2 + h2 + 1 < y1
-        )
+def room_center(room):
+    x, y, w, h = room
+    return (x + w // 2, y + h // 2)
 
-    def center(room):
-        x, y, w, h = room
-        return (x + w // 2, y + h // 2)
 
-    room_attempts = int(rows * cols * room_density)
+def carve_rooms(cave, room_attempts, min_room_size, max_room_size, min_x, max_x, min_y, max_y, rng):
+    """
+    Try room_attempts random rooms, carving those that do not touch an
+    earlier one. Returns the carved rooms as (x, y, w, h).
+    """
+    rooms = []
 
     for _ in range(room_attempts):
-        w = random.randint(min_room_size, max_room_size)
-        h = random.randint(min_room_size, max_room_size)
+        w = rng.randint(min_room_size, max_room_size)
+        h = rng.randint(min_room_size, max_room_size)
 
-        x = random.randint(min_x, max_x - w)
-        y = random.randint(min_y, max_y - h)
+        x = rng.randint(min_x, max_x - w)
+        y = rng.randint(min_y, max_y - h)
 
         new_room = (x, y, w, h)
 
-        if any(intersects(new_room, r) for r in rooms):
+        if any(rooms_intersect(new_room, r) for r in rooms):
             continue
 
-        carve_room(x, y, w, h)
+        cave[y:y + h, x:x + w] = FLOOR
         rooms.append(new_room)
 
-    # ----------------------
-    # Spawn & exit
-    # ----------------------
-    if rooms:
-        spawn_x, spawn_y = center(rooms[0])
-    else:
-        spawn_x, spawn_y = start_x, start_y
+    return rooms
 
-    exit_x, exit_y = find_farthest_cell(cave, spawn_x, spawn_y)
-    cave[exit_y][exit_x] = EXIT
 
-    # ----------------------
-    # Scatter items
-    # ----------------------
-    def scatter_item(cave, item_id, count, min_distance=4):
-        rows, cols = len(cave), len(cave[0])
-        placed_positions = []
-
-        attempts = 0
-        max_attempts = count * 50
-
-        while len(placed_positions) < count and attempts < max_attempts:
-            x = random.randint(LEFT_BORDER, cols - RIGHT_BORDER - 1)
-            y = random.randint(TOP_BORDER, rows - BOTTOM_BORDER - 1)
-
-            if cave[y][x] != FLOOR:
-                attempts += 1
-                continue
-
-            too_close = False
-            for px, py in placed_positions:
-                distance = math.sqrt((px - x)**2 + (py - y)**2)
-                if distance < min_distance:
-                    too_close = True
-                    break
+# ----------------------
+# Scatter items
+# ----------------------
+def scatter_item(cave, item_id, count, min_distance, rng):
+    """
+    Put up to count item_id tiles on floor cells, at least min_distance
+    apart from each other.
+    """
+    # Draw from the floor cells without replacement, and check
+    # min_distance against items in the neighbouring buckets of a
+    # spatial hash only, so each placement is O(1).
+    candidates = cells_of(cave, FLOOR)
+    placed = SpatialHash(min_distance)
+    min_dist_sq = min_distance * min_distance
+
+    while len(placed) < count and candidates:
+        i = rng.randrange(len(candidates))
+        candidates[i], candidates[-1] = candidates[-1], candidates[i]
+        x, y = candidates.pop()
+
+        too_close = False
+        for px, py in placed.query(x, y, min_distance):
+            if (px - x) ** 2 + (py - y) ** 2 < min_dist_sq:
+                too_close = True
+                break
+        if too_close:
+            continue
 
-            if too_close:
-                attempts += 1
-                continue
+        cave[y, x] = item_id
+        placed.insert((x, y), x, y)
 
-            cave[y][x] = item_id
-            placed_positions.append((x, y))
-            attempts += 1
 
-    scatter_item(cave, MAP, num_maps, min_distance=5)
-    scatter_item(cave, FOOD, num_foods, min_distance=3)
-    scatter_item(cave, LIGHT, num_lights, min_distance=4)
+def scatter_items(cave, num_maps, num_foods, num_lights, rng):
+    scatter_item(cave, MAP, num_maps, 5, rng)
+    scatter_item(cave, FOOD, num_foods, 3, rng)
+    scatter_item(cave, LIGHT, num_lights, 4, rng)
 
-    # ----------------------
-    # Place gates in narrow passages
-    # ----------------------
-    place_gates(cave, spawn=(spawn_x, spawn_y), exit_pos=(exit_x, exit_y), total_gates=num_gates)
 
-    return cave, (spawn_x, spawn_y)
+# ----------------------
+# Chunks of an unbounded cave
+# ----------------------
+def chunk_doors(seed, chunk_x, chunk_y, size, doors_per_edge=2):
+    """
+    Door rows (left, right) and columns (top, bottom) on the edges of a
+    chunk. Each edge is drawn from its own seed, shared by the two chunks
+    it separates, so their doors always line up.
+    """
+    def edge(axis, ex, ey):
+        edge_rng = random.Random(f"{seed}:edge:{axis}:{ex}:{ey}")
+        return sorted(edge_rng.sample(range(1, size - 1, 2), doors_per_edge))
+
+    return {
+        "left": edge("v", chunk_x - 1, chunk_y),
+        "right": edge("v", chunk_x, chunk_y),
+        "top": edge("h", chunk_x, chunk_y - 1),
+        "bottom": edge("h", chunk_x, chunk_y),
+    }
+
+
+def generate_chunk(chunk_x, chunk_y, size, seed,
+                   room_density=0.015,
+                   min_room_size=3,
+                   max_room_size=6,
+                   num_maps=1,
+                   num_foods=2,
+                   num_lights=2,
+                   num_gates=2,
+                   doors_per_edge=2):
+    """
+    Generate the size x size chunk at (chunk_x, chunk_y) of an unbounded
+    cave. The chunk depends only on seed and its coordinates, so it can be
+    generated (and regenerated) on its own. Its edges are walls except for
+    doors that open onto the neighbouring chunks' doors. size must be odd
+    so the maze reaches the edges.
+    """
+    if size % 2 == 0:
+        raise ValueError(f"chunk size must be odd, got {size}")
+    rng = random.Random(f"{seed}:chunk:{chunk_x}:{chunk_y}")
+    last = size - 2
+
+    cave, _ = carve_maze(size, size, 1, last, 1, last, rng)
+    carve_rooms(cave, int(size * size * room_density), min_room_size, max_room_size,
+                1, last, 1, last, rng)
+
+    doors = chunk_doors(seed, chunk_x, chunk_y, size, doors_per_edge)
+    door_cells = ([(0, y) for y in doors["left"]] + [(size - 1, y) for y in doors["right"]]
+                  + [(x, 0) for x in doors["top"]] + [(x, size - 1) for x in doors["bottom"]])
+    for x, y in door_cells:
+        cave[y, x] = FLOOR
+
+    scatter_items(cave, num_maps, num_foods, num_lights, rng)
+
+    # Gates may close corridors, but every door stays reachable from the
+    # others so the chunks keep joining up.
+    place_gates(cave, door_cells[0], door_cells[1], num_gates, rng)
+    for door in door_cells[2:]:
+        open_path_between(cave, door_cells[0], door)
+
+    return cave
 
 
 # ----------------------
 # Find farthest cell
 # ----------------------
 def find_farthest_cell(cave, start_x, start_y):
-    rows, cols = len(cave), len(cave[0])
-    dist = [[-1] * cols for _ in range(rows)]
-    queue = deque([(start_x, start_y)])
-    dist[start_y][start_x] = 0
-    farthest = (start_x, start_y)
-
-    while queue:
-        x, y = queue.popleft()
-        for dx, dy in [(0, -1), (1, 0), (0, 1), (-1, 0)]:
-            nx, ny = x + dx, y + dy
-            if 0 <= nx < cols and 0 <= ny < rows:
-                if cave[ny][nx] != WALL and dist[ny][nx] == -1:
-                    dist[ny][nx] = dist[y][x] + 1
-                    queue.append((nx, ny))
-                    farthest = (nx, ny)
+    rows, cols = grid_size(cave)
+    search = grid_search(rows, cols)
+    last = search.run(search.passable(cave, (WALL,)), (start_x, start_y))
+    return search.cell(last)
+
+
+# ----------------------
+# Corridor detection
+# ----------------------
+def corridor_masks(cave):
+    """
+    Return (horizontal, vertical) boolean masks of the whole grid.
+    horizontal marks cells with walls above and below (a corridor running
+    left-right), vertical marks cells with walls left and right.
+    Cells on the outer edge are never marked.
+    """
+    wall = cave == WALL
+    horizontal = np.zeros(wall.shape, dtype=bool)
+    vertical = np.zeros(wall.shape, dtype=bool)
+    horizontal[1:-1, 1:-1] = wall[:-2, 1:-1] & wall[2:, 1:-1]
+    vertical[1:-1, 1:-1] = wall[1:-1, :-2] & wall[1:-1, 2:]
+    return horizontal, vertical
+
 
-    return farthest
+def find_narrow_passages(cave):
+    """
+    Return the (x, y) of every floor cell inside a one-cell-wide corridor,
+    in row-major order.
+    """
+    horizontal, vertical = corridor_masks(cave)
+    ys, xs = np.nonzero((cave == FLOOR) & (horizontal | vertical))
+    return list(zip(xs.tolist(), ys.tolist()))
 
 
 # ----------------------
 # Gate placement
 # ----------------------
-def place_gates(cave, spawn, exit_pos, total_gates=6):
+def place_gates(cave, spawn, exit_pos, total_gates=6, rng=None):
     """
     Place exactly total_gates in narrow corridors, half open, half closed.
     """
-    rows, cols = len(cave), len(cave[0])
-    narrow_passages = []
-
-    # Identify narrow corridors
-    for y in range(1, rows-1):
-        for x in range(1, cols-1):
-            if cave[y][x] != FLOOR:
-                continue
-            # Narrow horizontally or vertically
-            if (cave[y][x-1]==WALL and cave[y][x+1]==WALL) or (cave[y-1][x]==WALL and cave[y+1][x]==WALL):
-                narrow_passages.append((x,y))
-
-    random.shuffle(narrow_passages)
+    rng = make_rng(rng=rng)
+    narrow_passages = find_narrow_passages(cave)
+
+    rng.shuffle(narrow_passages)
     gates_to_place = min(total_gates, len(narrow_passages))
     selected = narrow_passages[:gates_to_place]
 
     half = gates_to_place // 2
     for i, (x, y) in enumerate(selected):
         if i < half:
-            cave[y][x] = GATE_CLOSED
+            cave[y, x] = GATE_CLOSED
         else:
-            cave[y][x] = GATE_OPEN
+            cave[y, x] = GATE_OPEN
 
     # Ensure path from spawn to exit
     open_path_between(cave, spawn, exit_pos)
@@ -222,13 +339,22 @@ def place_gates(cave, spawn, exit_pos, total_gates=6):
 def open_path_between(cave, start, end):
     """
     Ensure a path from start to end exists by opening any gates along the path.
+    Returns the (x, y) gates that were opened.
     """
-    path = bfs_path(cave, start, end)
-    if not path:
-        return
+    return open_gates_on(cave, bfs_path(cave, start, end))
+
+
+def open_gates_on(cave, path):
+    """
+    Open every closed gate on path (a list of (x, y) cells).
+    Returns the (x, y) gates that were opened.
+    """
+    opened = []
     for x, y in path:
-        if cave[y][x] == GATE_CLOSED:
-            cave[y][x] = GATE_OPEN
+        if cave[y, x] == GATE_CLOSED:
+            cave[y, x] = GATE_OPEN
+            opened.append((x, y))
+    return opened
 
 
 def bfs_path(cave, start, end):
@@ -236,48 +362,71 @@ def bfs_path(cave, start, end):
     BFS pathfinding from start to end avoiding walls.
     Returns list of coordinates in path.
     """
-    rows, cols = len(cave), len(cave[0])
-    queue = deque([start])
-    prev = {start: None}
-
-    while queue:
-        cx, cy = queue.popleft()
-        if (cx, cy) == end:
-            break
-        for dx, dy in [(0,1),(1,0),(0,-1),(-1,0)]:
-            nx, ny = cx + dx, cy + dy
-            if 0 <= nx < cols and 0 <= ny < rows:
-                if cave[ny][nx] not in (WALL,) and (nx, ny) not in prev:
-                    queue.append((nx, ny))
-                    prev[(nx, ny)] = (cx, cy)
-
-    # Reconstruct path
-    if end not in prev:
-        return []
-    path = []
-    current = end
-    while current != start:
-        path.append(current)
-        current = prev[current]
-    path.append(start)
-    path.reverse()
-    return path
+    rows, cols = grid_size(cave)
+    search = grid_search(rows, cols)
+    search.run(search.passable(cave, (WALL,)), start, end, directions=(DOWN, RIGHT, UP, LEFT))
+    return search.path_to(end)
+
+
+class GoalPaths:
+    """
+    Shortest paths avoiding walls from any cell to one goal cell, from a
+    single BFS out of the goal. Walls never change once a cave is made, so
+    the search is done once per goal and each later path is read off the
+    BFS tree in steps proportional to its length.
+    """
+
+    def __init__(self, cave, goal):
+        rows, cols = grid_size(cave)
+        search = grid_search(rows, cols)
+        search.run(search.passable(cave, (WALL,)), goal, directions=(DOWN, RIGHT, UP, LEFT))
+        self.goal = goal
+        self.width = search.width
+        self.parent = array("i", search.parent)   # the shared search is reused by others
+
+    def path(self, start):
+        """
+        Cells (x, y) from start to the goal, or [] if it cannot be reached.
+        """
+        width = self.width
+        i = (start[1] + 1) * width + start[0] + 1
+        if self.parent[i] == UNREACHED and start != self.goal:
+            return []
+        path = []
+        while i != UNREACHED:
+            y, x = divmod(i, width)
+            path.append((x - 1, y - 1))
+            i = self.parent[i]
+        return path
 
 
 # ----------------------
 # Rearrange gates dynamically
 # ----------------------
-def rearrange_gates(cave, spawn, exit_pos, open_ratio=0.5):
+def rearrange_gates(cave, spawn, exit_pos, open_ratio=0.5, rng=None, gates=None, paths=None):
     """
     Randomly toggle gates while keeping guaranteed path from spawn to exit.
+    Returns the (x, y) gates whose state changed, so callers can update
+    anything derived from the cave without rescanning it.
+
+    Callers that shuffle the same cave again and again can pass gates, the
+    (x, y) gate cells in row-major order, and paths, a GoalPaths to
+    exit_pos; then the shuffle costs O(gates + path length) instead of a
+    scan and a search over the whole cave.
     """
-    gate_positions = [(x, y) for y, row in enumerate(cave) for x, cell in enumerate(row) if cell in (GATE_CLOSED, GATE_OPEN)]
-    random.shuffle(gate_positions)
+    rng = make_rng(rng=rng)
+    gate_positions = list(gates) if gates is not None else cells_of(cave, GATE_CLOSED, GATE_OPEN)
+    before = {(x, y): cave[y, x] for x, y in gate_positions}
+    rng.shuffle(gate_positions)
     num_open = int(len(gate_positions) * open_ratio)
     for i, (x, y) in enumerate(gate_positions):
-        cave[y][x] = GATE_OPEN if i < num_open else GATE_CLOSED
+        cave[y, x] = GATE_OPEN if i < num_open else GATE_CLOSED
 
-    open_path_between(cave, spawn, exit_pos)
+    if paths is not None:
+        open_gates_on(cave, paths.path(spawn))
+    else:
+        open_path_between(cave, spawn, exit_pos)
+    return [(x, y) for (x, y), tile in before.items() if cave[y, x] != tile]
 
 
 # ----------------------
@@ -315,7 +464,8 @@ if __name__ == "__main__":
         num_maps=3,
         num_foods=6,
         num_lights=5,
-        num_gates=8       # <-- Number of gates input here
+        num_gates=8,      # <-- Number of gates input here
+        seed=None         # <-- Set a number to get the same cave every run
     )
     exit_pos = find_farthest_cell(cave, spawn[0], spawn[1])
     print("Spawn:", spawn, "Exit:", exit_pos)
@@ -0,0 +1,124 @@
+import hashlib
+import json
+import os
+
+import numpy as np
+
+from grid import TILE_DTYPE
+
+# ----------------------
+# On-disk cave cache
+# ----------------------
+# Generated caves are kept on disk, keyed by the seed and every parameter
+# that shapes the cave, so starting the same level with the same seed again
+# skips generation entirely. Each entry is two files:
+#
+#   <key>.npy    the cave grid (plain .npy, memory-mapped copy-on-write
+#                when read: pages are only copied once the game changes
+#                them, and the file itself never is)
+#   <key>.json   spawn and exit cells, plus the parameters for reference
+#
+# The directory is kept under max_bytes by dropping the least recently
+# used entries (by file modification time, refreshed on every hit).
+
+# Bump when generate_cave changes its output for the same parameters, so
+# caves cached by an older version are not reused.
+CACHE_VERSION = 1
+
+
+class CaveCache:
+    def __init__(self, path, max_bytes=64 * 1024 * 1024):
+        self.path = path
+        self.max_bytes = max_bytes
+
+    def key(self, params):
+        """
+        File name stem for a dict of cave parameters (seed included).
+        """
+        text = json.dumps([CACHE_VERSION, sorted(params.items())])
+        return hashlib.sha1(text.encode()).hexdigest()
+
+    def _files(self, key):
+        base = os.path.join(self.path, key)
+        return f"{base}.npy", f"{base}.json"
+
+    def get(self, params):
+        """
+        Return (cave, spawn, exit) cached for params, or None. The cave is
+        a copy-on-write map of the cached file, so it can be changed
+        freely.
+        """
+        grid_path, meta_path = self._files(self.key(params))
+        try:
+            with open(meta_path) as f:
+                meta = json.load(f)
+            cave = np.asarray(np.load(grid_path, mmap_mode="c"))
+            os.utime(grid_path)   # mark as recently used
+            os.utime(meta_path)
+        except (OSError, ValueError):
+            return None
+
+        if cave.shape != (params["rows"], params["cols"]) or cave.dtype != TILE_DTYPE:
+            self._remove(grid_path, meta_path)
+            return None
+        spawn = tuple(meta["spawn"])
+        exit = tuple(meta["exit"]) if meta["exit"] is not None else None
+        return cave, spawn, exit
+
+    def put(self, params, cave, spawn, exit):
+        """
+        Store a generated cave for params, then evict old entries if the
+        cache grew past max_bytes.
+        """
+        os.makedirs(self.path, exist_ok=True)
+        grid_path, meta_path = self._files(self.key(params))
+
+        # Write both files under temporary names first, so a reader never
+        # sees half an entry. The grid goes in before its metadata, which
+        # is what get looks for first.
+        tmp = f"{grid_path}.tmp"
+        with open(tmp, "wb") as f:
+            np.save(f, np.ascontiguousarray(cave, dtype=TILE_DTYPE))
+        os.replace(tmp, grid_path)
+
+        meta = {"params": params, "spawn": list(spawn), "exit": list(exit) if exit else None}
+        tmp = f"{meta_path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(meta, f)
+        os.replace(tmp, meta_path)
+
+        self.evict()
+
+    def evict(self):
+        """
+        Delete least recently used entries until the cache fits max_bytes.
+        """
+        entries = {}
+        try:
+            names = os.listdir(self.path)
+        except OSError:
+            return
+        for name in names:
+            stem, ext = os.path.splitext(name)
+            if ext not in (".npy", ".json"):
+                continue
+            try:
+                st = os.stat(os.path.join(self.path, name))
+            except OSError:
+                continue
+            size, used = entries.get(stem, (0, 0))
+            entries[stem] = (size + st.st_size, max(used, st.st_mtime))
+
+        total = sum(size for size, _ in entries.values())
+        for stem, (size, _) in sorted(entries.items(), key=lambda item: item[1][1]):
+            if total <= self.max_bytes:
+                break
+            self._remove(*self._files(stem))
+            total -= size
+
+    def _remove(self, *paths):
+        for path in paths:
+            try:
+                os.remove(path)
+            except OSError:
+                pass   # already gone, or still mapped elsewhere (Windows)
@@ -0,0 +1,121 @@
+import random
+from collections import OrderedDict
+
+import numpy as np
+
+from cave import generate_chunk, find_farthest_cell, open_path_between, WALL, EXIT
+
+# ----------------------
+# Chunked (streaming) world
+# ----------------------
+# An unbounded cave made of square chunks generated on demand from the
+# world seed and the chunk coordinates. Only a window of chunks around the
+# player is ever assembled into a grid, and only the most recently used
+# chunks are kept in memory, so the world size costs neither generation
+# time up front nor memory.
+
+
+class ChunkWorld:
+    """
+    Chunks of chunk_size cells, generated with generate_chunk(**params).
+    At most max_chunks are kept; the least recently used are dropped and
+    regenerated from their seed when visited again (changes made to them,
+    like picked up items, are lost then).
+
+    The exit lies in one chunk exit_distance chunks away from chunk (0, 0).
+    """
+
+    def __init__(self, seed, chunk_size, params, max_chunks=64, exit_distance=8):
+        self.seed = seed
+        self.size = chunk_size
+        self.params = params
+        self.max_chunks = max_chunks
+        self.chunks = OrderedDict()   # (cx, cy) -> grid, least recently used first
+        self.exit_chunk = self._pick_exit_chunk(exit_distance)
+
+    def _pick_exit_chunk(self, distance):
+        rng = random.Random(f"{self.seed}:exit")
+        offset = rng.randint(-distance, distance)
+        return rng.choice([(offset, -distance), (distance, offset),
+                           (offset, distance), (-distance, offset)])
+
+    def chunk(self, cx, cy):
+        """
+        The grid of chunk (cx, cy), generated if it is not held.
+        """
+        key = (cx, cy)
+        chunk = self.chunks.get(key)
+        if chunk is not None:
+            self.chunks.move_to_end(key)
+            return chunk
+
+        chunk = generate_chunk(cx, cy, self.size, self.seed, **self.params)
+        if key == self.exit_chunk:
+            exit_x, exit_y = find_farthest_cell(chunk, 1, 1)
+            chunk[exit_y, exit_x] = EXIT
+            # The chunk's gates must not shut the exit in: open a way to it
+            # from a door (the doors all reach each other).
+            door = (0, int(np.flatnonzero(chunk[:, 0] != WALL)[0]))
+            open_path_between(chunk, door, (exit_x, exit_y))
+
+        self.chunks[key] = chunk
+        while len(self.chunks) > self.max_chunks:
+            self.chunks.popitem(last=False)
+        return chunk
+
+    def prefetch(self, origin, span, limit=1):
+        """
+        Generate up to limit missing chunks of the ring just outside the
+        window at origin, so the window finds them ready when it moves.
+        Cheap to call every frame. Returns how many were generated.
+        """
+        if (span + 2) ** 2 > self.max_chunks:
+            return 0   # the ring would push the window itself out
+        ox, oy = origin
+        done = 0
+        for j in range(-1, span + 1):
+            for i in range(-1, span + 1):
+                if (ox + i, oy + j) not in self.chunks:
+                    self.chunk(ox + i, oy + j)
+                    done += 1
+                    if done >= limit:
+                        return done
+        return done
+
+    def window(self, origin, span):
+        """
+        The span x span chunks starting at chunk origin (x, y), as one grid.
+        """
+        if span * span > self.max_chunks:
+            raise ValueError(f"a window of {span}x{span} chunks needs max_chunks >= {span * span}")
+        ox, oy = origin
+        return np.block([[self.chunk(ox + i, oy + j) for i in range(span)]
+                         for j in range(span)])
+
+    def adopt(self, origin, span, grid):
+        """
+        Take the chunks of a window grid (e.g. from a save file) as they
+        are, instead of generating them.
+        """
+        ox, oy = origin
+        size = self.size
+        for j in range(span):
+            for i in range(span):
+                key = (ox + i, oy + j)
+                self.chunks[key] = grid[j * size:(j + 1) * size, i * size:(i + 1) * size].copy()
+                self.chunks.move_to_end(key)
+        while len(self.chunks) > self.max_chunks:
+            self.chunks.popitem(last=False)
+
+    def store(self, origin, span, grid):
+        """
+        Write a grid returned by window (and changed since) back into the
+        chunks it was built from.
+        """
+        ox, oy = origin
+        size = self.size
+        for j in range(span):
+            for i in range(span):
+                chunk = self.chunks.get((ox + i, oy + j))
+                if chunk is not None:
+                    chunk[:] = grid[j * size:(j + 1) * size, i * size:(i + 1) * size]
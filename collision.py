@@ -0,0 +1,160 @@
+import numpy as np
+
+# ======================
+# TILE CONSTANTS
+# ======================
+
+WALL = 1
+GATE_CLOSED = 6
+
+# Tiles nothing can move through
+SOLID_TILES = (WALL, GATE_CLOSED)
+
+# Gap kept between a box and the solid cell it stopped against, so it does
+# not count as overlapping that cell (box edges are inclusive).
+SKIN = 1e-6
+
+
+# ----------------------
+# Solid cells
+# ----------------------
+# Which cells block movement, worked out once per cave and patched when
+# tiles change, instead of looking tiles up at every corner of every move.
+# Cells are stored like the search grids in gridsearch.py: flat, with a
+# one-cell solid border, so leaving the cave is just hitting a solid cell.
+
+
+class SolidMask:
+    """
+    Solid cells of a cave, and swept moves of square boxes (centre x, y,
+    half-size radius, in world pixels) against them.
+
+    A move goes along x, then along y, and stops at the first solid cell
+    the box would enter, so a box slides along walls and cannot pass
+    through one however far it moves in a step. Cells the box already
+    overlaps are not checked, so something caught in a gate as it closes
+    can still walk out.
+    """
+
+    def __init__(self, cave, cell_size, solid=SOLID_TILES):
+        self.cave = cave
+        self.cell_size = cell_size
+        self.solid_tiles = solid
+        self.rows, self.cols = cave.shape
+        self.width = self.cols + 2
+        self.solid = bytearray((self.rows + 2) * self.width)
+        # 2D view of the same bytes: the scalar sweep reads solid, the
+        # array sweep grid
+        self.grid = np.frombuffer(self.solid, dtype=np.uint8).reshape(self.rows + 2, self.width)
+        self.refresh()
+
+    def refresh(self):
+        """
+        Recompute every cell, after the whole cave changed.
+        """
+        self.grid[:] = 1
+        self.grid[1:-1, 1:-1] = np.isin(self.cave, self.solid_tiles)
+
+    def update_cells(self, cells):
+        """
+        Recompute the cells (x, y) whose tiles changed.
+        """
+        for x, y in cells:
+            self.solid[(y + 1) * self.width + x + 1] = self.cave[y, x] in self.solid_tiles
+
+    def is_solid(self, x, y):
+        """
+        True if cell (x, y) blocks movement (cells outside the cave do).
+        """
+        if not (0 <= x < self.cols and 0 <= y < self.rows):
+            return True
+        return bool(self.solid[(y + 1) * self.width + x + 1])
+
+    # ----------------
+    # ONE BOX
+    # ----------------
+
+    def move(self, x, y, dx, dy, radius):
+        """
+        Furthest position (x, y) a box can reach moving by (dx, dy).
+        """
+        if dx:
+            x = self._sweep(x, y, dx, radius, 1, self.width)
+        if dy:
+            y = self._sweep(y, x, dy, radius, self.width, 1)
+        return x, y
+
+    def _sweep(self, pos, across, delta, r, stride, across_stride):
+        # Sweep along one axis. stride steps one cell along it in the flat
+        # grid, across_stride one cell across it; both in padded cells.
+        cs = self.cell_size
+        limit = (self.cols if stride == 1 else self.rows) + 1
+        across_limit = (self.rows if stride == 1 else self.cols) + 1
+        first = max(0, min(int((across - r) // cs) + 1, across_limit))
+        last = max(0, min(int((across + r) // cs) + 1, across_limit))
+        lanes = [i * across_stride for i in range(first, last + 1)]
+        solid = self.solid
+
+        if delta > 0:
+            start = int((pos + r) // cs) + 1
+            end = min(int((pos + r + delta) // cs) + 1, limit)
+            for cell in range(start + 1, end + 1):
+                at = cell * stride
+                if any(solid[at + lane] for lane in lanes):
+                    return max(pos, (cell - 1) * cs - r - SKIN)
+        else:
+            start = int((pos - r) // cs) + 1
+            end = max(int((pos - r + delta) // cs) + 1, 0)
+            for cell in range(start - 1, end - 1, -1):
+                at = cell * stride
+                if any(solid[at + lane] for lane in lanes):
+                    return min(pos, cell * cs + r)
+        return pos + delta
+
+    # ----------------
+    # MANY BOXES
+    # ----------------
+
+    def move_many(self, xs, ys, dxs, dys, radius):
+        """
+        move for arrays of boxes at once. Returns new (xs, ys) arrays.
+        """
+        xs = self._sweep_many(xs, ys, dxs, radius, axis=1)
+        ys = self._sweep_many(ys, xs, dys, radius, axis=0)
+        return xs, ys
+
+    def _sweep_many(self, pos, across, delta, r, axis):
+        cs = self.cell_size
+        grid = self.grid if axis == 1 else self.grid.T
+        limit = grid.shape[1] - 1
+        across_limit = grid.shape[0] - 1
+
+        pos = np.asarray(pos, dtype=np.float64)
+        delta = np.broadcast_to(np.asarray(delta, dtype=np.float64), pos.shape)
+        first = np.clip(np.floor_divide(across - r, cs).astype(np.intp) + 1, 0, across_limit)
+        last = np.clip(np.floor_divide(across + r, cs).astype(np.intp) + 1, 0, across_limit)
+
+        forward = delta > 0
+        lead = np.where(forward, pos + r, pos - r)
+        step = np.where(forward, 1, -1)
+        start = np.floor_divide(lead, cs).astype(np.intp) + 1
+        end = np.clip(np.floor_divide(lead + delta, cs).astype(np.intp) + 1, 0, limit)
+        crossed = np.abs(end - start)
+
+        result = pos + delta
+        stopped = np.zeros(pos.shape, dtype=bool)
+        for k in range(1, int(crossed.max(initial=0)) + 1):
+            cell = start + step * k
+            active = (k <= crossed) & ~stopped
+            if not active.any():
+                break
+            hit = np.zeros(pos.shape, dtype=bool)
+            for lane in range(int((last - first).max(initial=0)) + 1):
+                row = np.minimum(first + lane, last)
+                hit |= grid[row, np.clip(cell, 0, limit)].astype(bool)
+            hit &= active
+            stop_at = np.where(forward, np.maximum(pos, (cell - 1) * cs - r - SKIN),
+                               np.minimum(pos, cell * cs + r))
+            result = np.where(hit, stop_at, result)
+            stopped |= hit
+        return result
@@ -0,0 +1,138 @@
+import numpy as np
+
+from spatial import SpatialHash
+
+# Facing
+FACING_LEFT = -1
+FACING_RIGHT = 1
+
+# Per-enemy update state of the last step
+ENEMY_IDLE = 0     # not updated (lights too low, or skipped far enemy)
+ENEMY_NEAR = 1     # near the player, updated every step
+ENEMY_FAR = 2      # far away, updated in a round-robin group
+
+
+# ======================
+# ENEMY POOL
+# ======================
+
+class EnemyPool:
+    """
+    All enemies as parallel arrays (structure of arrays): x, y in world
+    pixels, facing (FACING_LEFT / FACING_RIGHT) and state (ENEMY_*).
+    Updates work on all enemies at once instead of one dict at a time.
+
+    Once index() has been called, enemies are also kept in a SpatialHash
+    by their index, so near() and touching() only look at the buckets
+    around a point instead of at every enemy.
+    """
+
+    def __init__(self, xs, ys):
+        self.x = np.asarray(xs, dtype=np.float64)
+        self.y = np.asarray(ys, dtype=np.float64)
+        self.facing = np.full(len(self.x), FACING_RIGHT, dtype=np.int8)
+        self.state = np.full(len(self.x), ENEMY_IDLE, dtype=np.uint8)
+        self.buckets = None   # SpatialHash of enemy indices, see index()
+        self._bx = self._by = None   # bucket of each enemy in buckets
+
+    @classmethod
+    def from_cells(cls, cells, cell_size):
+        """
+        One enemy centred in each (x, y) cave cell.
+        """
+        cells = np.asarray(cells, dtype=np.float64).reshape(-1, 2)
+        return cls(cells[:, 0] * cell_size + cell_size // 2,
+                   cells[:, 1] * cell_size + cell_size // 2)
+
+    def __len__(self):
+        return len(self.x)
+
+    # ----------------
+    # BUCKETS
+    # ----------------
+
+    def index(self, bucket_size):
+        """
+        Put every enemy in a new SpatialHash of bucket_size buckets. chase
+        keeps it up to date; call reindex after moving enemies any other
+        way.
+        """
+        self.buckets = SpatialHash(bucket_size)
+        self.reindex()
+
+    def reindex(self):
+        """
+        Rebuild the buckets from the current positions.
+        """
+        size = self.buckets.bucket_size
+        self.buckets = SpatialHash(size)
+        for i, (x, y) in enumerate(zip(self.x.tolist(), self.y.tolist())):
+            self.buckets.insert(i, x, y)
+        self._bx = np.floor_divide(self.x, size).astype(np.int64)
+        self._by = np.floor_divide(self.y, size).astype(np.int64)
+
+    def _rebucket(self, idx):
+        # Only enemies that crossed into another bucket touch the hash
+        size = self.buckets.bucket_size
+        bx = np.floor_divide(self.x[idx], size).astype(np.int64)
+        by = np.floor_divide(self.y[idx], size).astype(np.int64)
+        crossed = (bx != self._bx[idx]) | (by != self._by[idx])
+        for i in idx[crossed].tolist():
+            self.buckets.move(i, self.x[i], self.y[i])
+        self._bx[idx] = bx
+        self._by[idx] = by
+
+    def near(self, x, y, radius):
+        """
+        Indices (sorted) of the enemies in every bucket overlapping the
+        square of half-size radius around (x, y): all enemies within
+        radius, and some a little farther.
+        """
+        found = self.buckets.query(x, y, radius)
+        return np.sort(np.array(found, dtype=np.intp))
+
+    def chase(self, target_x, target_y, speed, dt, solid, radius):
+        """
+        Move every enemy toward (target_x, target_y) by speed * dt. The
+        target and dt are scalars or one value per enemy (dt 0 leaves it
+        in place). Moves are swept against solid (a SolidMask) so enemies
+        slide along walls.
+        """
+        dt = np.broadcast_to(np.asarray(dt, dtype=np.float64), self.x.shape)
+        idx = np.flatnonzero(dt > 0)
+        if idx.size == 0:
+            return
+
+        target_x = np.broadcast_to(np.asarray(target_x, dtype=np.float64), self.x.shape)[idx]
+        target_y = np.broadcast_to(np.asarray(target_y, dtype=np.float64), self.y.shape)[idx]
+        x, y = self.x[idx], self.y[idx]
+        dx = target_x - x
+        dy = target_y - y
+        dist = np.hypot(dx, dy)
+        moving = dist != 0
+        idx, x, y, dx, dy, dist = idx[moving], x[moving], y[moving], dx[moving], dy[moving], dist[moving]
+
+        move_dist = speed * dt[idx]
+        step_x = dx / dist * move_dist
+        step_y = dy / dist * move_dist
+
+        # Update facing direction by horizontal intent
+        self.facing[idx[step_x > 0]] = FACING_RIGHT
+        self.facing[idx[step_x < 0]] = FACING_LEFT
+
+        # Move in x then y, stopping at walls and closed gates
+        x, y = solid.move_many(x, y, step_x, step_y, radius)
+
+        self.x[idx] = x
+        self.y[idx] = y
+        if self.buckets is not None:
+            self._rebucket(idx)
+
+    def touching(self, x, y, radius):
+        """
+        True if any enemy is within radius of (x, y) on both axes. Needs
+        index().
+        """
+        idx = self.near(x, y, radius)
+        hit = (np.abs(self.x[idx] - x) < radius) & (np.abs(self.y[idx] - y) < radius)
+        return bool(hit.any())
@@ -0,0 +1,60 @@
+import numpy as np
+
+# ----------------------
+# Cave grid storage
+# ----------------------
+# The cave is a 2D uint8 array indexed [y, x]. It still supports the
+# cave[y][x] style used across the game, so old callers keep working,
+# while generation, scanning and rendering can work on whole arrays.
+
+TILE_DTYPE = np.uint8
+
+
+def new_grid(rows, cols, fill):
+    """
+    Create a rows x cols grid with every cell set to fill.
+    """
+    return np.full((rows, cols), fill, dtype=TILE_DTYPE)
+
+
+def as_grid(cave):
+    """
+    Return cave as a grid, converting a list of lists if needed.
+    """
+    return np.asarray(cave, dtype=TILE_DTYPE)
+
+
+def to_lists(cave):
+    """
+    Return a plain list-of-lists copy of the grid (for debugging or JSON).
+    """
+    return as_grid(cave).tolist()
+
+
+def grid_size(cave):
+    """
+    Return (rows, cols) of the grid.
+    """
+    rows, cols = as_grid(cave).shape
+    return rows, cols
+
+
+def cells_of(cave, *tiles):
+    """
+    Return the (x, y) positions of every cell holding one of the given tiles,
+    in row-major order.
+    """
+    ys, xs = np.nonzero(np.isin(as_grid(cave), tiles))
+    return list(zip(xs.tolist(), ys.tolist()))
+
+
+def first_cell_of(cave, tile):
+    """
+    Return the (x, y) of the first cell (row-major) holding tile, or None.
+    """
+    cave = as_grid(cave)
+    flat = np.flatnonzero(cave == tile)
+    if flat.size == 0:
+        return None
+    y, x = divmod(int(flat[0]), cave.shape[1])
+    return (x, y)
@@ -0,0 +1,179 @@
+import threading
+from array import array
+from collections import deque
+
+import numpy as np
+
+# ----------------------
+# Grid search engine
+# ----------------------
+# Breadth-first search over a cave using flat cell indices. The cave is
+# seen through a one-cell blocked border, so a neighbour of any cell is
+# just index + offset and never needs a bounds check. Distance and parent
+# arrays (int32) and the queue are allocated once per cave size and reused
+# by every search.
+
+WALL = 1
+
+UNREACHED = -1
+
+# Neighbour orders as (dx, dy). The order decides which of several equally
+# short paths is found.
+UP, RIGHT, DOWN, LEFT = (0, -1), (1, 0), (0, 1), (-1, 0)
+CLOCKWISE = (UP, RIGHT, DOWN, LEFT)
+
+
+class GridSearch:
+    def __init__(self, rows, cols):
+        self.rows, self.cols = rows, cols
+        self.width = cols + 2
+        size = (rows + 2) * self.width
+        self._unset = array("i", [UNREACHED]) * size
+        self.dist = array("i", self._unset)
+        self.parent = array("i", self._unset)
+        self.label = array("i", self._unset)   # nearest source, for run_many
+        self.queue = deque()
+
+    def index(self, x, y):
+        return (y + 1) * self.width + x + 1
+
+    def cell(self, i):
+        y, x = divmod(i, self.width)
+        return x - 1, y - 1
+
+    def passable(self, cave, blocking):
+        """
+        Flat bytearray of the padded grid, 1 where the tile is not in
+        blocking.
+        """
+        padded = np.zeros((self.rows + 2, self.width), dtype=np.uint8)
+        padded[1:-1, 1:-1] = ~np.isin(cave, blocking)
+        return bytearray(padded.tobytes())
+
+    def run(self, passable, start, goal=None, directions=CLOCKWISE):
+        """
+        BFS from cell start (x, y) over passable, filling dist and parent.
+        Stops once goal (x, y) is reached, if given. Returns the flat index
+        of the last cell reached (the goal, or a farthest cell).
+        """
+        dist, parent, queue = self.dist, self.parent, self.queue
+        dist[:] = self._unset
+        parent[:] = self._unset
+        queue.clear()
+
+        offsets = [dy * self.width + dx for dx, dy in directions]
+        s = self.index(*start)
+        g = self.index(*goal) if goal is not None else -1
+        dist[s] = 0
+        queue.append(s)
+        last = s
+        if s == g:
+            return s
+
+        pop, push = queue.popleft, queue.append
+        while queue:
+            i = pop()
+            d = dist[i] + 1
+            for o in offsets:
+                j = i + o
+                if passable[j] and dist[j] == UNREACHED:
+                    dist[j] = d
+                    parent[j] = i
+                    push(j)
+                    last = j
+                    if j == g:
+                        queue.clear()
+                        return j
+        return last
+
+    def run_many(self, passable, sources, directions=CLOCKWISE):
+        """
+        One BFS sweep from every cell in sources at once. Fills dist with
+        the distance to the nearest source, label with that source's
+        position in sources, and parent. Ties go to the earlier source.
+        """
+        dist, parent, label, queue = self.dist, self.parent, self.label, self.queue
+        dist[:] = self._unset
+        parent[:] = self._unset
+        label[:] = self._unset
+        queue.clear()
+
+        offsets = [dy * self.width + dx for dx, dy in directions]
+        for n, cell in enumerate(sources):
+            s = self.index(*cell)
+            if dist[s] == UNREACHED:
+                dist[s] = 0
+                label[s] = n
+                queue.append(s)
+
+        pop, push = queue.popleft, queue.append
+        while queue:
+            i = pop()
+            d = dist[i] + 1
+            n = label[i]
+            for o in offsets:
+                j = i + o
+                if passable[j] and dist[j] == UNREACHED:
+                    dist[j] = d
+                    parent[j] = i
+                    label[j] = n
+                    push(j)
+
+    def path_to(self, goal):
+        """
+        Cells (x, y) from the start of the last run (the nearest source for
+        run_many) to goal, or [] if goal was not reached.
+        """
+        i = self.index(*goal)
+        if self.dist[i] == UNREACHED:
+            return []
+        path = []
+        while i != UNREACHED:
+            path.append(self.cell(i))
+            i = self.parent[i]
+        path.reverse()
+        return path
+
+    def _grid(self, flat):
+        flat = np.frombuffer(flat, dtype=np.int32)
+        return flat.reshape(self.rows + 2, self.width)[1:-1, 1:-1]
+
+    def dist_grid(self):
+        """
+        Distances of the last run as a (rows, cols) int32 array (a view,
+        overwritten by the next run).
+        """
+        return self._grid(self.dist)
+
+    def label_grid(self):
+        """
+        Nearest-source labels of the last run_many, like dist_grid.
+        """
+        return self._grid(self.label)
+
+
+_local = threading.local()
+
+
+def grid_search(rows, cols):
+    """
+    Shared GridSearch for a cave size, so repeated searches reuse its
+    buffers. Each thread gets its own (the next cave may be generated in a
+    background thread).
+    """
+    search = getattr(_local, "search", None)
+    if search is None or (search.rows, search.cols) != (rows, cols):
+        search = _local.search = GridSearch(rows, cols)
+    return search
+
+
+def nearest_sources(cave, sources, blocking=(WALL,)):
+    """
+    Distance field from many sources in one sweep. Returns (labels, dist)
+    as (rows, cols) int32 arrays: labels[y, x] is the position in sources
+    of the nearest source to (x, y) and dist[y, x] the steps to it, both
+    UNREACHED where no source can be reached.
+    """
+    search = grid_search(*cave.shape)
+    search.run_many(search.passable(cave, blocking), sources)
+    return search.label_grid().copy(), search.dist_grid().copy()
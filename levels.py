@@ -0,0 +1,161 @@
+import random
+
+from cave import generate_cave, EXIT
+from chunks import ChunkWorld
+from grid import first_cell_of
+
+# ======================
+# LEVEL PRESETS
+# ======================
+
+LEVELS = ["easy", "medium", "hard"]
+
+# Levels played on an unbounded ChunkWorld instead of one pre-generated
+# cave. Their item, gate and enemy counts are per chunk / per window, and
+# WORLD_ROWS x WORLD_COLS is the size of the window around the player.
+STREAMING_LEVELS = ["endless"]
+
+# SEED fixes the cave of a level (same seed -> same cave); None picks a new
+# random seed for every game. KIOSK_SEED is the seed use_kiosk_seeds pins
+# the level to.
+LEVEL_PRESETS = {
+    "easy": {
+        "WORLD_ROWS": 46,
+        "WORLD_COLS": 50,
+        "MAP_NUM": 3,
+        "FOOD_NUM": 8,
+        "LIGHT_NUM": 8,
+        "GATE_NUM": 10,
+        "ENEMY_COUNT": 10,
+        "SEED": None,
+        "KIOSK_SEED": 1101,
+    },
+    "medium": {
+        "WORLD_ROWS": 71,
+        "WORLD_COLS": 75,
+        "MAP_NUM": 6,
+        "FOOD_NUM": 16,
+        "LIGHT_NUM": 16,
+        "GATE_NUM": 20,
+        "ENEMY_COUNT": 20,
+        "SEED": None,
+        "KIOSK_SEED": 1102,
+    },
+    "hard": {
+        "WORLD_ROWS": 96,
+        "WORLD_COLS": 100,
+        "MAP_NUM": 12,
+        "FOOD_NUM": 32,
+        "LIGHT_NUM": 32,
+        "GATE_NUM": 40,
+        "ENEMY_COUNT": 40,
+        "SEED": None,
+        "KIOSK_SEED": 1103,
+    },
+    "endless": {
+        "WORLD_ROWS": 165,
+        "WORLD_COLS": 165,
+        "CHUNK_SIZE": 33,       # cells per chunk side (odd)
+        "VIEW_CHUNKS": 5,       # window of VIEW_CHUNKS x VIEW_CHUNKS chunks
+        "MAX_CHUNKS": 64,       # chunks kept in memory
+        "EXIT_DISTANCE": 12,    # chunks from the start to the exit chunk
+        "MAP_NUM": 1,
+        "FOOD_NUM": 3,
+        "LIGHT_NUM": 3,
+        "GATE_NUM": 4,
+        "ENEMY_COUNT": 40,
+        "SEED": None,
+        "KIOSK_SEED": 1104,
+    },
+}
+
+# Shared by every level
+DENSITY = 0.2
+MAX_ROOM_SIZE = 10
+MIN_ROOM_SIZE = 3
+
+
+def pick_seed(level):
+    """
+    Return the preset seed of the level, or a fresh random one.
+    """
+    seed = LEVEL_PRESETS[level]["SEED"]
+    if seed is None:
+        seed = random.randrange(2**32)
+    return seed
+
+
+def use_kiosk_seeds():
+    """
+    Pin every level to its KIOSK_SEED (kiosk deployments). Each level then
+    always plays the same cave, which after the first start comes from the
+    cave cache instead of being generated. Call before the cave
+    pregenerator starts, so its worker sees the pinned seeds.
+    """
+    for preset in LEVEL_PRESETS.values():
+        preset["SEED"] = preset["KIOSK_SEED"]
+
+
+def level_cave_params(level, seed):
+    """
+    Every generate_cave argument of the named level preset for seed, as a
+    dict (also the key of the cave cache).
+    """
+    preset = LEVEL_PRESETS[level]
+    return {
+        "rows": preset["WORLD_ROWS"],
+        "cols": preset["WORLD_COLS"],
+        "room_density": DENSITY,
+        "min_room_size": MIN_ROOM_SIZE,
+        "max_room_size": MAX_ROOM_SIZE,
+        "num_maps": preset["MAP_NUM"],
+        "num_foods": preset["FOOD_NUM"],
+        "num_lights": preset["LIGHT_NUM"],
+        "num_gates": preset["GATE_NUM"],
+        "seed": seed,
+    }
+
+
+def generate_level_cave(level, seed, cache=None):
+    """
+    Generate the cave of the named level preset for seed.
+    Returns (cave, spawn) like generate_cave. With a CaveCache, a cave
+    generated before for the same seed and parameters is reused. The cache
+    is only used for levels with a fixed SEED (see use_kiosk_seeds): a
+    random seed is never asked for again, so caching its cave would only
+    cost disk writes and evict caves that are.
+    """
+    params = level_cave_params(level, seed)
+    if LEVEL_PRESETS[level]["SEED"] is None:
+        cache = None
+    if cache is not None:
+        cached = cache.get(params)
+        if cached is not None:
+            cave, spawn, _ = cached
+            return cave, spawn
+
+    cave, spawn = generate_cave(**params)
+    if cache is not None:
+        try:
+            cache.put(params, cave, spawn, first_cell_of(cave, EXIT))
+        except OSError:
+            pass   # a full or read-only disk only costs the speed-up
+    return cave, spawn
+
+
+def make_level_world(level, seed):
+    """
+    Create the ChunkWorld of a streaming level preset for seed.
+    """
+    preset = LEVEL_PRESETS[level]
+    params = {
+        "room_density": DENSITY,
+        "min_room_size": MIN_ROOM_SIZE,
+        "max_room_size": MAX_ROOM_SIZE,
+        "num_maps": preset["MAP_NUM"],
+        "num_foods": preset["FOOD_NUM"],
+        "num_lights": preset["LIGHT_NUM"],
+        "num_gates": preset["GATE_NUM"],
+    }
+    return ChunkWorld(seed, preset["CHUNK_SIZE"], params,
+                      max_chunks=preset["MAX_CHUNKS"], exit_distance=preset["EXIT_DISTANCE"])
@@ -0,0 +1,71 @@
+from collections import OrderedDict
+
+import numpy as np
+import pygame
+
+# ----------------------
+# Light falloff overlay
+# ----------------------
+# The darkness overlay is a black surface whose alpha grows with the square
+# of the distance from the screen centre, reaching max_alpha at the light
+# radius. Each pixel's whole-pixel distance is computed once; an overlay is
+# then built by looking its alpha up in a ramp with one entry per distance.
+# Light levels are rounded to the nearest LIGHT_BUCKET percent, fine enough
+# that the light radius shrinks by a few pixels at a time, and only the
+# overlays of the last MAX_OVERLAYS levels are kept: light changes slowly,
+# so that is the current one and the one it just left. Drawing is a single
+# blit per frame.
+
+LIGHT_BUCKET = 1     # light percentage step between overlays
+MAX_OVERLAYS = 2     # full-screen SRCALPHA surfaces kept around
+
+
+class LightMap:
+    def __init__(self, size, max_alpha=230,
+                 bucket=LIGHT_BUCKET, max_overlays=MAX_OVERLAYS):
+        self.size = size
+        self.max_alpha = max_alpha
+        self.bucket = bucket
+        self.max_overlays = max_overlays
+        self.overlays = OrderedDict()  # radius -> Surface
+
+        width, height = size
+        xs = np.arange(width, dtype=np.float32) - width // 2
+        ys = np.arange(height, dtype=np.float32) - height // 2
+        # Indexed [y, x], the surface's own memory order, so filling the
+        # transposed surfarray view is one pass. Distances are rounded up
+        # because each pixel takes the alpha of the smallest circle that
+        # covers it.
+        self.dist = np.ceil(np.sqrt(xs[None, :] ** 2 + ys[:, None] ** 2)).astype(np.uint16)
+        # Squared distance of each ramp entry (one per whole-pixel distance)
+        self.ramp_dist_sq = np.arange(int(self.dist.max()) + 1, dtype=np.float32) ** 2
+
+    def radius_for(self, light_percentage):
+        light = int(light_percentage / self.bucket + 0.5) * self.bucket
+        return int((self.size[1] // 2) * (light / 100))
+
+    def _build(self, radius):
+        overlay = pygame.Surface(self.size, pygame.SRCALPHA)
+        overlay.fill((0, 0, 0, self.max_alpha))
+        if radius > 0:
+            ramp = np.minimum(self.ramp_dist_sq * (self.max_alpha / radius ** 2),
+                              self.max_alpha).astype(np.uint8)
+            pixels = pygame.surfarray.pixels_alpha(overlay)
+            pixels.T[:] = ramp[self.dist]
+            del pixels  # unlock the surface
+        return overlay
+
+    def get(self, light_percentage):
+        """
+        Return the overlay surface for the given light level.
+        """
+        radius = self.radius_for(light_percentage)
+        overlay = self.overlays.get(radius)
+        if overlay is None:
+            overlay = self._build(radius)
+            self.overlays[radius] = overlay
+            if len(self.overlays) > self.max_overlays:
+                self.overlays.popitem(last=False)
+        else:
+            self.overlays.move_to_end(radius)
+        return overlay
@@ -1,51 +1,44 @@
 import pygame
+import os
 import time
-from cave import generate_cave
-from cave import rearrange_gates
+from cave import corridor_masks
 from map import draw_map
+from tile_layer import TileLayer
+from lightmap import LightMap
+from asset_cache import load_image
+from text_cache import get_font, render_text
+from levels import LEVELS, STREAMING_LEVELS, LEVEL_PRESETS, use_kiosk_seeds
+from simulation import FRAMES, FixedStepper
+from pregen import CavePregenerator
+from cave_cache import CaveCache
+from enemies import FACING_RIGHT
+from savegame import save_session, load_session
+from profiler import FrameProfiler
 
 # ======================
 # CONFIGURATION
 # ======================
 
-LEVELS = ["easy", "medium", "hard"]
+# Levels the LEVEL button cycles through
+MENU_LEVELS = LEVELS + STREAMING_LEVELS
+
 current_level_index = 0
-LEVEL = LEVELS[current_level_index]
+LEVEL = MENU_LEVELS[current_level_index]
 
 def set_level_from_index():
     global LEVEL, WORLD_ROWS, WORLD_COLS, MAP_NUM, FOOD_NUM, LIGHT_NUM, GATE_NUM, ENEMY_COUNT
-    LEVEL = LEVELS[current_level_index]
-    if LEVEL == "easy":
-        WORLD_ROWS = 46
-        WORLD_COLS = 50
-        MAP_NUM = 3
-        FOOD_NUM = 8
-        LIGHT_NUM = 8
-        GATE_NUM = 10
-        ENEMY_COUNT = 10
-    elif LEVEL == "medium":
-        WORLD_ROWS = 71
-        WORLD_COLS = 75
-        MAP_NUM = 6
-        FOOD_NUM = 16
-        LIGHT_NUM = 16
-        GATE_NUM = 20
-        ENEMY_COUNT = 20
-    elif LEVEL == "hard":
-        WORLD_ROWS = 96
-        WORLD_COLS = 100
-        MAP_NUM = 12
-        FOOD_NUM = 32
-        LIGHT_NUM = 32
-        GATE_NUM = 40
-        ENEMY_COUNT = 40
+    LEVEL = MENU_LEVELS[current_level_index]
+    preset = LEVEL_PRESETS[LEVEL]
+    WORLD_ROWS = preset["WORLD_ROWS"]
+    WORLD_COLS = preset["WORLD_COLS"]
+    MAP_NUM = preset["MAP_NUM"]
+    FOOD_NUM = preset["FOOD_NUM"]
+    LIGHT_NUM = preset["LIGHT_NUM"]
+    GATE_NUM = preset["GATE_NUM"]
+    ENEMY_COUNT = preset["ENEMY_COUNT"]
 
 set_level_from_index()
 
-DENSITY = 0.2
-MAX_ROOM_SIZE = 10
-MIN_ROOM_SIZE = 3
-
 VIEW_ROWS = 7
 VIEW_COLS = 11
 
@@ -54,15 +47,30 @@ WALL_SCALE = 1
 
 FPS = 60
 
+# Kiosk deployments: play every level on its fixed KIOSK_SEED cave, so
+# after the first start of a level NEW GAME loads it from the cave cache
+KIOSK_MODE = False
+
+SAVE_PATH = "autosave.sav"
+AUTOSAVE_SECONDS = 5  # while playing
+
+# Frame profiler: PROFILE_KEY shows the per-phase timing graph of the last
+# PROFILE_FRAMES frames, PROFILE_DUMP_KEY writes them to PROFILE_DUMP.csv
+# and PROFILE_DUMP.json
+PROFILE_PHASES = ["events", "movement", "items", "enemies", "streaming", "autosave",
+                  "draw_world", "light", "ui", "profiler", "flip"]
+PROFILE_FRAMES = 300
+PROFILE_KEY = pygame.K_F3
+PROFILE_DUMP_KEY = pygame.K_F4
+PROFILE_DUMP = "frame_profile"
+PROFILE_GRAPH_HEIGHT = 100
+PROFILE_GRAPH_MS = 40     # frame time at the top of the graph
+PROFILE_LEGEND_EVERY = 30 # frames between legend refreshes
+
 BLACK = (0, 0, 0)
 LIGHT_GRAY = (98, 87, 85)
 GREEN = (0, 200, 0)
 
-inventory = {
-    "FOOD": 0,
-    "MAP": 0
-}
-
 trade_options = {
     "FOOD_ENERGY": "Food -> Energy",
     "FOOD_LIGHT": "Food -> Light +50%",
@@ -74,34 +82,7 @@ trade_options = {
 
 
 
-# ======================
-# MOVEMENT
-# ======================
-
-MAX_MOVE_SPEED = 500
-MIN_MOVE_SPEED = 0
-
-# ======================
-# LIGHT
-# ======================
-
-MAX_LIGHT = 100
-MIN_LIGHT = 10
-LIGHT_DRAIN_PER_SEC = 0.85
-
-# ======================
-# ENERGY
-# ======================
-
-MAX_ENERGY = 100
-MIN_ENERGY = 0
-ENERGY_DRAIN_PER_SEC = 0.6
-
-# ======================
-# ENEMIES
-# ======================
-ENEMY_SPEED = 100  # pixels per second
-ENEMY_TRIGGER_LIGHT = 20  # light % at which enemies start moving
+# Movement, light, energy and enemy tuning live in simulation.py
 
 # ======================
 # TILE CONSTANTS
@@ -120,6 +101,15 @@ GATE_OPEN = 7
 # INIT
 # ======================
 
+# Caves generated before are reused from disk (levels with a fixed SEED,
+# e.g. all of them in KIOSK_MODE)
+if KIOSK_MODE:
+    use_kiosk_seeds()
+CAVE_CACHE_DIR = "cave_cache"
+CAVE_CACHE_BYTES = 64 * 1024 * 1024
+cave_pregen = CavePregenerator(BASE_CELL_SIZE, CaveCache(CAVE_CACHE_DIR, CAVE_CACHE_BYTES))
+cave_pregen.start()  # forks the worker, so before pygame starts any threads
+
 pygame.init()
 click_sfx = pygame.mixer.Sound("assets/sounds/click.wav")
 click_sfx.set_volume(0.3)
@@ -133,32 +123,26 @@ SCREEN_HEIGHT = VIEW_ROWS * BASE_CELL_SIZE
 screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
 pygame.display.set_caption("Cave Explorer")
 clock = pygame.time.Clock()
-font = pygame.font.SysFont(None, 24)
+font = get_font(None, 24)
+light_map = LightMap((SCREEN_WIDTH, SCREEN_HEIGHT))
+profiler = FrameProfiler(PROFILE_PHASES, PROFILE_FRAMES)
+show_profiler = False
 
-wall_image = pygame.image.load("assets/wall_block.jpg")
-wall_image = pygame.transform.scale(
-    wall_image, (BASE_CELL_SIZE, BASE_CELL_SIZE)
-)
+wall_image = load_image("assets/wall_block.jpg", (BASE_CELL_SIZE, BASE_CELL_SIZE))
 
-map_btn_img = pygame.image.load("assets/buttons/map_btn.jpg").convert_alpha()
-trade_btn_img = pygame.image.load("assets/buttons/inventory.jpg").convert_alpha()
-back_btn_img = pygame.image.load("assets/buttons/back_btn.jpg").convert_alpha()
-
-# Optional: scale to fit the button size
-map_btn_img = pygame.transform.scale(map_btn_img, (80, 80))
-trade_btn_img = pygame.transform.scale(trade_btn_img, (80, 80))
-back_btn_img = pygame.transform.scale(back_btn_img, (80, 80))
+map_btn_img = load_image("assets/buttons/map_btn.jpg", (80, 80), alpha=True)
+trade_btn_img = load_image("assets/buttons/inventory.jpg", (80, 80), alpha=True)
+back_btn_img = load_image("assets/buttons/back_btn.jpg", (80, 80), alpha=True)
 
 
 # ======================
 # SPRITES
 # ======================
 
-character_sheet = pygame.image.load("assets/chars.jpg")
+character_sheet = load_image("assets/chars.jpg")
 
 SPRITE_WIDTH = 177.5
 SPRITE_HEIGHT = 205.5
-FRAMES = 4
 
 def extract_frames(row):
     frames = []
@@ -189,61 +173,43 @@ sprites = {
 # ITEM IMAGES
 # ======================
 
-map_image = pygame.image.load("assets/map.jpg")
-map_image = pygame.transform.scale(map_image, (BASE_CELL_SIZE // 2, BASE_CELL_SIZE // 2))
+map_image = load_image("assets/map.jpg", (BASE_CELL_SIZE // 2, BASE_CELL_SIZE // 2))
 
-food_image = pygame.image.load("assets/food.jpg")
-food_image = pygame.transform.scale(food_image, (BASE_CELL_SIZE // 2, BASE_CELL_SIZE // 2))
+food_image = load_image("assets/food.jpg", (BASE_CELL_SIZE // 2, BASE_CELL_SIZE // 2))
 
-light_image = pygame.image.load("assets/light.jpg")
-light_image = pygame.transform.scale(light_image, (BASE_CELL_SIZE // 2, BASE_CELL_SIZE // 2))
+light_image = load_image("assets/light.jpg", (BASE_CELL_SIZE // 2, BASE_CELL_SIZE // 2))
 
 # Gates
-gate_closed_h = pygame.image.load("assets/doors/closed_horizontal.jpg")
-gate_closed_h = pygame.transform.scale(gate_closed_h, (BASE_CELL_SIZE, BASE_CELL_SIZE))
-gate_closed_v = pygame.image.load("assets/doors/closed_vertical.jpg")
-gate_closed_v = pygame.transform.scale(gate_closed_v, (BASE_CELL_SIZE, BASE_CELL_SIZE))
+gate_closed_h = load_image("assets/doors/closed_horizontal.jpg", (BASE_CELL_SIZE, BASE_CELL_SIZE))
+gate_closed_v = load_image("assets/doors/closed_vertical.jpg", (BASE_CELL_SIZE, BASE_CELL_SIZE))
 
-gate_open_h = pygame.image.load("assets/doors/open_horizontal.jpg")
-gate_open_h = pygame.transform.scale(gate_open_h, (BASE_CELL_SIZE, BASE_CELL_SIZE))
-gate_open_v = pygame.image.load("assets/doors/open_vertical.jpg")
-gate_open_v = pygame.transform.scale(gate_open_v, (BASE_CELL_SIZE, BASE_CELL_SIZE))
+gate_open_h = load_image("assets/doors/open_horizontal.jpg", (BASE_CELL_SIZE, BASE_CELL_SIZE))
+gate_open_v = load_image("assets/doors/open_vertical.jpg", (BASE_CELL_SIZE, BASE_CELL_SIZE))
 
-finish_image = pygame.image.load("assets/finish.jpg")
-finish_image = pygame.transform.scale(finish_image, (BASE_CELL_SIZE, BASE_CELL_SIZE))
+finish_image = load_image("assets/finish.jpg", (BASE_CELL_SIZE, BASE_CELL_SIZE))
 
 # Monsters
 MONSTER_SIZE = BASE_CELL_SIZE // 2
-monster_left = pygame.image.load("assets/monleft.jpg")
-monster_left = pygame.transform.scale(monster_left, (MONSTER_SIZE, MONSTER_SIZE))
-monster_right = pygame.image.load("assets/monright.jpg")
-monster_right = pygame.transform.scale(monster_right, (MONSTER_SIZE, MONSTER_SIZE))
+monster_left = load_image("assets/monleft.jpg", (MONSTER_SIZE, MONSTER_SIZE))
+monster_right = load_image("assets/monright.jpg", (MONSTER_SIZE, MONSTER_SIZE))
 
 # Background
-menu_bg = pygame.image.load("assets/shadow_of_death_menu.png").convert()
-menu_bg = pygame.transform.scale(menu_bg, (SCREEN_WIDTH, SCREEN_HEIGHT))
+menu_bg = load_image("assets/shadow_of_death_menu.png", (SCREEN_WIDTH, SCREEN_HEIGHT))
 
 # Menu and Game Over Buttons
-new_game_btn_img = pygame.image.load("assets/buttons/new_game.jpg").convert_alpha()
-new_game_btn_img = pygame.transform.scale(new_game_btn_img, (260, 60))
+new_game_btn_img = load_image("assets/buttons/new_game.jpg", (260, 60), alpha=True)
 
-back_to_menu_btn_img = pygame.image.load("assets/buttons/back_to_menu.jpg").convert_alpha()
-back_to_menu_btn_img = pygame.transform.scale(back_to_menu_btn_img, (260, 60))
+back_to_menu_btn_img = load_image("assets/buttons/back_to_menu.jpg", (260, 60), alpha=True)
 
-level_easy_btn_img = pygame.image.load("assets/buttons/level_easy.jpg").convert_alpha()
-level_easy_btn_img = pygame.transform.scale(level_easy_btn_img, (260, 60))
+level_easy_btn_img = load_image("assets/buttons/level_easy.jpg", (260, 60), alpha=True)
 
-level_med_btn_img = pygame.image.load("assets/buttons/level_med.jpg").convert_alpha()
-level_med_btn_img = pygame.transform.scale(level_med_btn_img, (260, 60))
+level_med_btn_img = load_image("assets/buttons/level_med.jpg", (260, 60), alpha=True)
 
-level_hard_btn_img = pygame.image.load("assets/buttons/level_hard.jpg").convert_alpha()
-level_hard_btn_img = pygame.transform.scale(level_hard_btn_img, (260, 60))
+level_hard_btn_img = load_image("assets/buttons/level_hard.jpg", (260, 60), alpha=True)
 
-how_to_play_btn_img = pygame.image.load("assets/buttons/how_to_play.jpg").convert_alpha()
-how_to_play_btn_img = pygame.transform.scale(how_to_play_btn_img, (260, 60))
+how_to_play_btn_img = load_image("assets/buttons/how_to_play.jpg", (260, 60), alpha=True)
 
-quit_btn_img = pygame.image.load("assets/buttons/quit.jpg").convert_alpha()
-quit_btn_img = pygame.transform.scale(quit_btn_img, (260, 60))
+quit_btn_img = load_image("assets/buttons/quit.jpg", (260, 60), alpha=True)
 
 
 # ======================
@@ -252,48 +218,26 @@ quit_btn_img = pygame.transform.scale(quit_btn_img, (260, 60))
 
 GAME_STATE = "MENU"  # MENU, PLAYING, HOWTO
 
+session = None          # GameSession of the current run (gameplay state)
+stepper = None          # FixedStepper running session at a fixed tick rate
 cave = None
-player_x = player_y = 0
-player_radius = BASE_CELL_SIZE // 4
-
-player_direction = "down"
-animation_frame = 0
-animation_timer = 0
-ANIM_SPEED = 0.15
-
-light_percentage = MAX_LIGHT
-energy_percentage = MAX_ENERGY
-map_count = 0  # Number of times player can open the map after collecting MAP
+gate_horizontal = None  # corridor mask used to orient gate sprites
+tile_layer = None       # pre-rendered static tiles of the current cave
+autosave_timer = 0
+has_autosave = os.path.exists(SAVE_PATH)
 
 # ======================
 # HELPERS
 # ======================
 
-def can_move_pixel(x, y):
-    for ox in (-player_radius, player_radius):
-        for oy in (-player_radius, player_radius):
-            cx = int((x + ox) // BASE_CELL_SIZE)
-            cy = int((y + oy) // BASE_CELL_SIZE)
-            if not (0 <= cx < WORLD_COLS and 0 <= cy < WORLD_ROWS):
-                return False
-            if cave[cy][cx] in (WALL, GATE_CLOSED):
-                return False
-    return True
-
 def get_camera_offset():
+    player_x, player_y = stepper.player_position()
     cam_x = player_x - SCREEN_WIDTH // 2
     cam_y = player_y - SCREEN_HEIGHT // 2
     cam_x = max(0, min(cam_x, WORLD_COLS * BASE_CELL_SIZE - SCREEN_WIDTH))
     cam_y = max(0, min(cam_y, WORLD_ROWS * BASE_CELL_SIZE - SCREEN_HEIGHT))
     return int(cam_x), int(cam_y)
 
-def find_exit_cell():
-    for y in range(WORLD_ROWS):
-        for x in range(WORLD_COLS):
-            if cave[y][x] == EXIT:
-                return (x, y)
-    return None
-
 def draw_blurred_button(button_surf, rect):
     # Create a copy of the button surface
     temp = pygame.Surface((rect.width, rect.height))
@@ -337,7 +281,7 @@ def draw_bar(x, y, value, label, color):
     pygame.draw.rect(screen, (50, 50, 50), (x, y, w, h))
     pygame.draw.rect(screen, (200, 200, 200), (x, y, w, h), 2)
     pygame.draw.rect(screen, color, (x, y, int(w * value / 100), h))
-    txt = font.render(f"{label}: {int(value)}%", True, (255, 255, 255))
+    txt = render_text(font, f"{label}: {int(value)}%", (255, 255, 255))
     screen.blit(txt, (x + w + 10, y + 3))
 
 def draw_back_button():
@@ -354,85 +298,141 @@ def draw_back_button():
 # ======================
 
 def draw_light_overlay():
-    overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
-    overlay.fill((0, 0, 0, 230))
-    radius = int((SCREEN_HEIGHT // 2) * (light_percentage / 100))
-    center = (SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2)
-
-    for r in range(radius, 0, -1):
-        alpha = int(230 * (r / radius) ** 2)
-        pygame.draw.circle(overlay, (0, 0, 0, alpha), center, r)
-
-    screen.blit(overlay, (0, 0))
+    screen.blit(light_map.get(session.light_percentage), (0, 0))
 
 # ======================
 # WORLD RENDER
 # ======================
 
+def draw_tile(surface, wx, wy, sx, sy):
+    tile = cave[wy, wx]
+
+    # Draw walls and gates
+    if tile == WALL:
+        surface.blit(wall_image, (sx, sy))
+    elif tile in (GATE_CLOSED, GATE_OPEN):
+        # Orientation comes from the surrounding walls
+        horizontal = gate_horizontal[wy, wx]   # corridor is horizontal
+
+        if tile == GATE_CLOSED:
+            sprite = gate_closed_h if horizontal else gate_closed_v
+        else:
+            sprite = gate_open_h if horizontal else gate_open_v
+        surface.blit(sprite, (sx, sy))
+    elif tile==EXIT:
+        surface.blit(finish_image, (sx, sy))
+    else:
+        pygame.draw.rect(surface, LIGHT_GRAY,
+                         (sx, sy, BASE_CELL_SIZE, BASE_CELL_SIZE))
+
+    # Draw items as small circles on floor
+    circle_center = (sx + BASE_CELL_SIZE // 2, sy + BASE_CELL_SIZE // 2)
+
+    if tile in (MAP, FOOD, LIGHT):
+        if tile == MAP:
+            item_rect = map_image.get_rect(center=circle_center)
+            surface.blit(map_image, item_rect)
+        elif tile == FOOD:
+            item_rect = food_image.get_rect(center=circle_center)
+            surface.blit(food_image, item_rect)
+        elif tile == LIGHT:
+            item_rect = light_image.get_rect(center=circle_center)
+            surface.blit(light_image, item_rect)
+
 def draw_world():
     cam_x, cam_y = get_camera_offset()
 
-    for r in range(VIEW_ROWS):
-        for c in range(VIEW_COLS):
-            wx = c + cam_x // BASE_CELL_SIZE
-            wy = r + cam_y // BASE_CELL_SIZE
-            sx = c * BASE_CELL_SIZE - cam_x % BASE_CELL_SIZE
-            sy = r * BASE_CELL_SIZE - cam_y % BASE_CELL_SIZE
-
-            if not (0 <= wx < WORLD_COLS and 0 <= wy < WORLD_ROWS):
-                continue
-
-            tile = cave[wy][wx]
-
-            # Draw walls and gates
-            if tile == WALL:
-                screen.blit(wall_image, (sx, sy))
-            elif tile in (GATE_CLOSED, GATE_OPEN):
-                # Decide orientation from surrounding walls
-                left_wall = (wx > 0 and cave[wy][wx-1] == WALL)
-                right_wall = (wx < WORLD_COLS-1 and cave[wy][wx+1] == WALL)
-                up_wall = (wy > 0 and cave[wy-1][wx] == WALL)
-                down_wall = (wy < WORLD_ROWS-1 and cave[wy+1][wx] == WALL)
-
-                horizontal = up_wall and down_wall   # corridor is horizontal
-                vertical = left_wall and right_wall   # corridor is vertical
-
-                if tile == GATE_CLOSED:
-                    sprite = gate_closed_h if horizontal else gate_closed_v
-                else:
-                    sprite = gate_open_h if horizontal else gate_open_v
-                screen.blit(sprite, (sx, sy))
-            elif tile==EXIT:
-                screen.blit(finish_image, (sx, sy))
-            else:
-                pygame.draw.rect(screen, LIGHT_GRAY,
-                                 (sx, sy, BASE_CELL_SIZE, BASE_CELL_SIZE))
-
-            # Draw items as small circles on floor
-            circle_radius = BASE_CELL_SIZE // 4
-            circle_center = (sx + BASE_CELL_SIZE // 2, sy + BASE_CELL_SIZE // 2)
-
-            if tile in (MAP, FOOD, LIGHT):
-                if tile == MAP:
-                    item_rect = map_image.get_rect(center=circle_center)
-                    screen.blit(map_image, item_rect)
-                elif tile == FOOD:
-                    item_rect = food_image.get_rect(center=circle_center)
-                    screen.blit(food_image, item_rect)
-                elif tile == LIGHT:
-                    item_rect = light_image.get_rect(center=circle_center)
-                    screen.blit(light_image, item_rect)
-
-    # Draw player sprite
-    sprite = sprites[player_direction][animation_frame]
+    # Static tiles come from the cached layer, patched where the session
+    # changed cells (pickups, gate shuffles) since the last frame
+    tile_layer.update_cells(session.changed_cells)
+    session.changed_cells.clear()
+    tile_layer.draw(screen, cam_x, cam_y)
+
+    # Player and enemies are drawn between their last two simulation steps
+    player_x, player_y = stepper.player_position()
+    sprite = sprites[session.player_direction][session.animation_frame]
     screen.blit(sprite, sprite.get_rect(center=(player_x - cam_x, player_y - cam_y)))
-    # Draw enemies
-    for enemy in enemies:
-        sprite = monster_right if enemy.get("dir") == "right" else monster_left
-        rect = sprite.get_rect(center=(int(enemy["x"] - cam_x), int(enemy["y"] - cam_y)))
+    # Draw enemies (only the ones on screen)
+    xs, ys = stepper.enemy_positions()
+    on_screen = ((xs > cam_x - MONSTER_SIZE) & (xs < cam_x + SCREEN_WIDTH + MONSTER_SIZE)
+                 & (ys > cam_y - MONSTER_SIZE) & (ys < cam_y + SCREEN_HEIGHT + MONSTER_SIZE))
+    for ex, ey, facing in zip(xs[on_screen].tolist(), ys[on_screen].tolist(),
+                              session.enemies.facing[on_screen].tolist()):
+        sprite = monster_right if facing == FACING_RIGHT else monster_left
+        rect = sprite.get_rect(center=(int(ex - cam_x), int(ey - cam_y)))
         screen.blit(sprite, rect)
 
 
+# ======================
+# FRAME PROFILER
+# ======================
+
+# One colour per profiled phase, then "other"
+profile_colours = [
+    (230, 80, 80), (80, 200, 120), (240, 200, 60), (200, 90, 220), (90, 200, 230), (250, 150, 60),
+    (80, 120, 240), (250, 250, 160), (160, 230, 90), (120, 120, 120), (240, 130, 180), (70, 70, 70),
+]
+profile_graph = pygame.Surface((PROFILE_FRAMES, PROFILE_GRAPH_HEIGHT))
+profile_graph.fill((20, 20, 20))
+profile_graph_frame = 0     # profiler.count when the graph was last drawn
+profile_legend = None
+profile_legend_frame = 0
+
+def render_profile_legend():
+    # Mean / max per phase over the recorded frames
+    summary = profiler.summary()
+    legend = pygame.Surface((PROFILE_FRAMES, len(profiler.columns) * 18), pygame.SRCALPHA)
+    for i, name in enumerate(profiler.columns):
+        row_y = i * 18
+        if i < len(profile_colours):
+            pygame.draw.rect(legend, profile_colours[i], (0, row_y + 3, 10, 10))
+        stats = summary.get(name, {"mean": 0.0, "max": 0.0})
+        # Numbers change at every refresh, so not worth keeping in the text cache
+        txt = font.render(f"{name}: {stats['mean']:.2f} / {stats['max']:.2f} ms", True, (255, 255, 255))
+        legend.blit(txt, (16, row_y))
+    return legend
+
+def draw_profiler():
+    global profile_legend, profile_legend_frame, profile_graph_frame
+    # The graph scrolls left by one pixel per frame; only frames recorded
+    # since it was last drawn are added on the right, as stacked columns
+    new = min(profiler.count - profile_graph_frame, PROFILE_FRAMES)
+    profile_graph_frame = profiler.count
+    scale = PROFILE_GRAPH_HEIGHT / PROFILE_GRAPH_MS
+    if new:
+        profile_graph.scroll(-new, 0)
+        profile_graph.fill((20, 20, 20), (PROFILE_FRAMES - new, 0, new, PROFILE_GRAPH_HEIGHT))
+        history = profiler.history()[-new:]
+        for i, row in enumerate(history[:, :len(profile_colours)].tolist()):
+            column = PROFILE_FRAMES - len(history) + i
+            bottom = PROFILE_GRAPH_HEIGHT
+            for colour, ms in zip(profile_colours, row):
+                top = bottom - ms * scale
+                if int(top) < int(bottom):
+                    pygame.draw.line(profile_graph, colour, (column, int(bottom) - 1), (column, max(int(top), 0)))
+                bottom = top
+                if bottom <= 0:
+                    break
+
+    x, y = 100, 10
+    screen.blit(profile_graph, (x, y))
+    budget_y = y + PROFILE_GRAPH_HEIGHT - int(1000 / FPS * scale)
+    pygame.draw.line(screen, (255, 255, 255), (x, budget_y), (x + PROFILE_FRAMES, budget_y))
+    pygame.draw.rect(screen, (200, 200, 200), (x, y, PROFILE_FRAMES, PROFILE_GRAPH_HEIGHT), 1)
+
+    if profile_legend is None or profiler.count - profile_legend_frame >= PROFILE_LEGEND_EVERY:
+        profile_legend = render_profile_legend()
+        profile_legend_frame = profiler.count
+    screen.blit(profile_legend, (x, y + PROFILE_GRAPH_HEIGHT + 6))
+
+def dump_profile():
+    try:
+        profiler.dump(f"{PROFILE_DUMP}.csv")
+        profiler.dump(f"{PROFILE_DUMP}.json")
+    except OSError:
+        pass
+
+
 # ======================
 # MENU
 # ======================
@@ -471,13 +471,20 @@ def draw_menu(mouse):
                 btn_image = level_easy_btn_img
             elif LEVEL == "medium":
                 btn_image = level_med_btn_img
-            else:
+            elif LEVEL == "hard":
                 btn_image = level_hard_btn_img
+            else:
+                btn_image = None  # no button art for this level
         else:
             btn_image = button_images[i]
 
         # Draw the button image
-        screen.blit(btn_image, rect.topleft)
+        if btn_image is None:
+            pygame.draw.rect(screen, (40, 34, 33), rect, border_radius=8)
+            level_text = render_text(font_medium, f"LEVEL: {LEVEL.upper()}", (255, 255, 255))
+            screen.blit(level_text, level_text.get_rect(center=rect.center))
+        else:
+            screen.blit(btn_image, rect.topleft)
         
         # Add hover effect with slight overlay
         if hover:
@@ -491,14 +498,18 @@ def draw_menu(mouse):
 
         buttons[label] = rect
 
+    if has_autosave:
+        hint = render_text(font_small, "Press C to continue the saved game", (220, 220, 220))
+        screen.blit(hint, hint.get_rect(center=(panel_x + panel_width // 2,
+                                                start_y + 120 + len(labels) * spacing + 10)))
+
     return buttons
 
 
 
 def draw_win_screen():
-    # ---------- LOAD & DRAW BACKGROUND IMAGE ----------
-    win_bg = pygame.image.load("assets/win_screen.png").convert()
-    win_bg = pygame.transform.scale(win_bg, (SCREEN_WIDTH, SCREEN_HEIGHT))
+    # ---------- DRAW BACKGROUND IMAGE ----------
+    win_bg = load_image("assets/win_screen.png", (SCREEN_WIDTH, SCREEN_HEIGHT))
     screen.blit(win_bg, (0, 0))
 
     # ---------- BUTTONS ----------
@@ -551,9 +562,8 @@ def draw_win_screen():
 
 
 def draw_game_over_screen():
-    # ---------- LOAD & DRAW BACKGROUND IMAGE ----------
-    game_over_bg = pygame.image.load("assets/game_over_screen.png").convert()
-    game_over_bg = pygame.transform.scale(game_over_bg, (SCREEN_WIDTH, SCREEN_HEIGHT))
+    # ---------- DRAW BACKGROUND IMAGE ----------
+    game_over_bg = load_image("assets/game_over_screen.png", (SCREEN_WIDTH, SCREEN_HEIGHT))
     screen.blit(game_over_bg, (0, 0))
 
     # ---------- BUTTON STYLING ----------
@@ -613,33 +623,30 @@ def draw_trade_window(mouse):
     pygame.draw.rect(screen, (40, 40, 40), (window_x, window_y, window_w, window_h))
     pygame.draw.rect(screen, (200, 200, 200), (window_x, window_y, window_w, window_h), 2)
 
-    title_font = pygame.font.SysFont(None, 36)
-    msg_font = pygame.font.SysFont(None, 24)
+    title_font = get_font(None, 36)
+    msg_font = get_font(None, 24)
 
-    title = title_font.render("TRADE", True, (255, 255, 255))
+    title = render_text(title_font, "TRADE", (255, 255, 255))
     screen.blit(title, title.get_rect(center=(SCREEN_WIDTH//2, window_y + 30)))
 
 
     # ---------- INVENTORY DISPLAY ----------
-    food_icon = pygame.image.load("assets/food.jpg").convert_alpha()
-    map_icon  = pygame.image.load("assets/map.jpg").convert_alpha()
-
     inv_y = window_y + 70
     icon_size = 64
     spacing = 120
 
     # Food
-    food_icon_scaled = pygame.transform.scale(food_icon, (icon_size, icon_size))
+    food_icon_scaled = load_image("assets/food.jpg", (icon_size, icon_size), alpha=True)
     food_x = SCREEN_WIDTH // 2 - spacing
     screen.blit(food_icon_scaled, (food_x, inv_y))
-    food_text = msg_font.render(f"x {inventory['FOOD']}", True, (255, 255, 255))
+    food_text = render_text(msg_font, f"x {session.inventory['FOOD']}", (255, 255, 255))
     screen.blit(food_text, (food_x + icon_size + 8, inv_y + 20))
 
     # Map
-    map_icon_scaled = pygame.transform.scale(map_icon, (icon_size, icon_size))
+    map_icon_scaled = load_image("assets/map.jpg", (icon_size, icon_size), alpha=True)
     map_x = SCREEN_WIDTH // 2 + spacing // 2
     screen.blit(map_icon_scaled, (map_x, inv_y))
-    map_text = msg_font.render(f"x {inventory['MAP']}", True, (255, 255, 255))
+    map_text = render_text(msg_font, f"x {session.inventory['MAP']}", (255, 255, 255))
     screen.blit(map_text, (map_x + icon_size + 8, inv_y + 20))
 
     buttons = {}
@@ -660,20 +667,20 @@ def draw_trade_window(mouse):
         hover = rect.collidepoint(mouse)
 
         usable = True
-        if key.startswith("FOOD") and inventory["FOOD"] == 0:
+        if key.startswith("FOOD") and session.inventory["FOOD"] == 0:
             usable = False
-        elif key.startswith("MAP") and inventory["MAP"] == 0:
+        elif key.startswith("MAP") and session.inventory["MAP"] == 0:
             usable = False
 
         if usable:
             pygame.draw.rect(screen, (110,110,110) if hover else (70,70,70), rect)
             pygame.draw.rect(screen, (180,180,180), rect, 2)
-            text = msg_font.render(label, True, (255,255,255))
+            text = render_text(msg_font, label, (255,255,255))
             screen.blit(text, text.get_rect(center=rect.center))
         else:
             # Draw blurred / disabled button
             draw_blurred_button(trade_btn_img, rect)  # Reuse the same style
-            text = msg_font.render(label, True, (200,200,200))
+            text = render_text(msg_font, label, (200,200,200))
             screen.blit(text, text.get_rect(center=rect.center))
 
         buttons[key] = rect
@@ -693,7 +700,7 @@ def draw_confirm_back(mouse):
     pygame.draw.rect(screen, (30, 30, 30), (box_x, box_y, box_w, box_h))
     pygame.draw.rect(screen, (200, 200, 200), (box_x, box_y, box_w, box_h), 2)
 
-    msg = font_medium.render("Return to main menu?", True, (255, 255, 255))
+    msg = render_text(font_medium, "Return to main menu?", (255, 255, 255))
     screen.blit(msg, msg.get_rect(center=(SCREEN_WIDTH // 2, box_y + 40)))
 
     btn_w, btn_h = 120, 40
@@ -709,72 +716,74 @@ def draw_confirm_back(mouse):
             border_radius=6
         )
         pygame.draw.rect(screen, (180, 180, 180), rect, 2, border_radius=6)
-        txt = font_small.render(label, True, (255, 255, 255))
+        txt = render_text(font_small, label, (255, 255, 255))
         screen.blit(txt, txt.get_rect(center=rect.center))
 
     return yes_rect, no_rect
 
 
 
+def begin_session(new_session):
+    global session, stepper, cave, gate_horizontal, tile_layer, GAME_STATE, autosave_timer
+    session = new_session
+    stepper = FixedStepper(session)
+    session.profiler = profiler
+    cave = session.cave
+    # Walls only change when a streaming level moves its window, so gate
+    # orientation is worked out once per cave
+    gate_horizontal, _ = corridor_masks(cave)
+    tile_layer = TileLayer(cave, BASE_CELL_SIZE, draw_tile, (SCREEN_WIDTH, SCREEN_HEIGHT))
+    autosave_timer = 0
+    GAME_STATE = "PLAYING"
+
 def start_new_game():
-    global cave, player_x, player_y, map_count
-    global light_percentage, energy_percentage, GAME_STATE
     set_level_from_index()
-    cave, (cx, cy) = generate_cave(
-        WORLD_ROWS, WORLD_COLS, DENSITY, MIN_ROOM_SIZE, MAX_ROOM_SIZE, MAP_NUM, FOOD_NUM, LIGHT_NUM, GATE_NUM
-    )
-
-    global enemies
-    enemies = []
-
-    floor_cells = [(x, y) for y in range(WORLD_ROWS) for x in range(WORLD_COLS) if cave[y][x] == FLOOR]
-    import random
-    for _ in range(ENEMY_COUNT):
-        if floor_cells:
-            ex, ey = random.choice(floor_cells)
-            floor_cells.remove((ex, ey))
-            enemies.append({
-                "x": ex * BASE_CELL_SIZE + BASE_CELL_SIZE // 2,
-                "y": ey * BASE_CELL_SIZE + BASE_CELL_SIZE // 2,
-                "dir": "right"
-            })
-
-    player_x = cx * BASE_CELL_SIZE + BASE_CELL_SIZE // 2
-    player_y = cy * BASE_CELL_SIZE + BASE_CELL_SIZE // 2
-    light_percentage = MAX_LIGHT
-    energy_percentage = MAX_ENERGY
-    map_count = 0
-    inventory["FOOD"] = 0
-    inventory["MAP"] = 0
-    GAME_STATE = "PLAYING"
+    # Usually already generated in the background while in the menus
+    begin_session(cave_pregen.take(LEVEL))
+
+def continue_game():
+    global current_level_index
+    try:
+        saved = load_session(SAVE_PATH)
+    except (OSError, ValueError):
+        return False
+    if saved.level in MENU_LEVELS:
+        current_level_index = MENU_LEVELS.index(saved.level)
+        set_level_from_index()
+    begin_session(saved)
+    return True
 
-font_title = pygame.font.SysFont(None, 64)
-font_medium = pygame.font.SysFont(None, 36)
-font_text  = pygame.font.SysFont(None, 28)
-font_small = pygame.font.SysFont(None, 24)
+def autosave():
+    global has_autosave, autosave_timer
+    autosave_timer = 0
+    try:
+        save_session(session, SAVE_PATH)
+        has_autosave = True
+    except OSError:
+        pass
+
+def remove_autosave():
+    global has_autosave
+    if has_autosave:
+        try:
+            os.remove(SAVE_PATH)
+        except OSError:
+            pass
+        has_autosave = False
+
+font_title = get_font(None, 64)
+font_medium = get_font(None, 36)
+font_text  = get_font(None, 28)
+font_small = get_font(None, 24)
 
 howto_icons = {
-    "OBJECTIVE": pygame.transform.scale(
-        pygame.image.load("assets/howto/objective.jpg").convert_alpha(), (48, 48)
-    ),
-    "ITEMS": pygame.transform.scale(
-        pygame.image.load("assets/howto/items.jpg").convert_alpha(), (48, 48)
-    ),
-    "PLAYER": pygame.transform.scale(
-        pygame.image.load("assets/howto/stats.jpg").convert_alpha(), (48, 48)
-    ),
-    "TRADING": pygame.transform.scale(
-        pygame.image.load("assets/howto/trade.jpg").convert_alpha(), (48, 48)
-    ),
-    "ENEMIES": pygame.transform.scale(
-        pygame.image.load("assets/howto/enemy.jpg").convert_alpha(), (48, 48)
-    ),
-    "SURVIVAL": pygame.transform.scale(
-        pygame.image.load("assets/howto/tips.jpg").convert_alpha(), (48, 48)
-    ),
-    "WINNING": pygame.transform.scale(
-        pygame.image.load("assets/howto/win.jpg").convert_alpha(), (48, 48)
-    ),
+    "OBJECTIVE": load_image("assets/howto/objective.jpg", (48, 48), alpha=True),
+    "ITEMS": load_image("assets/howto/items.jpg", (48, 48), alpha=True),
+    "PLAYER": load_image("assets/howto/stats.jpg", (48, 48), alpha=True),
+    "TRADING": load_image("assets/howto/trade.jpg", (48, 48), alpha=True),
+    "ENEMIES": load_image("assets/howto/enemy.jpg", (48, 48), alpha=True),
+    "SURVIVAL": load_image("assets/howto/tips.jpg", (48, 48), alpha=True),
+    "WINNING": load_image("assets/howto/win.jpg", (48, 48), alpha=True),
 }
 
 HEADER_COLOR = (255, 215, 120)
@@ -877,37 +886,27 @@ def is_subheader(line, next_line):
 
 
 
-def draw_how_to_play(mouse, scroll_delta=0):
-    global how_to_scroll, max_scroll
+# The page is wrapped and rendered once into one tall surface; drawing and
+# scrolling only blit the visible part of it.
+how_to_page = None      # (key, surface) of the laid-out page
 
-    screen.fill((18, 18, 18))
+HOW_TO_PANEL_WIDTH = 1000
+HOW_TO_PANEL_COLOR = (32, 32, 32)
 
-    # ---------- PANEL ----------
-    panel_width = 1000
+def how_to_visible_height():
     panel_height = SCREEN_HEIGHT - 150
-    panel_x = (SCREEN_WIDTH - panel_width) // 2
-    panel_y = 100
-    panel_rect = pygame.Rect(panel_x, panel_y, panel_width, panel_height)
-
-    pygame.draw.rect(screen, (32, 32, 32), panel_rect, border_radius=12)
-    pygame.draw.rect(screen, (180, 180, 180), panel_rect, 2, border_radius=12)
-
-    # ---------- TITLE ----------
-    title_surf = font_title.render("HOW TO PLAY", True, HEADER_COLOR)
-    screen.blit(title_surf, title_surf.get_rect(center=(SCREEN_WIDTH // 2, 50)))
-
-    # ---------- SCROLL ----------
-    how_to_scroll += scroll_delta * scroll_speed
-
-    text_surface = pygame.Surface(
-        (panel_width - 60, panel_height - 70 - top_padding - bottom_padding),
-        pygame.SRCALPHA
-    )
-
-    y_offset = top_padding + how_to_scroll
+    return panel_height - 70 - top_padding - bottom_padding
+
+def layout_how_to_play(width):
+    """
+    Wrap and render HOW_TO_PLAY_TEXT into a surface width pixels wide and
+    as tall as the text needs (top_padding included).
+    """
+    y_offset = top_padding
     line_spacing = 38
-    max_text_width = panel_width - 120
-    total_text_height = 0
+    max_text_width = HOW_TO_PANEL_WIDTH - 120
+    blits = []       # (surface, position)
+    underlines = []  # y of each subheader underline
 
     for i, line in enumerate(HOW_TO_PLAY_TEXT):
         line = line.strip()
@@ -916,86 +915,100 @@ def draw_how_to_play(mouse, scroll_delta=0):
         # ---------- HEADER ----------
         if is_header(line):
             clean_header = line.replace("•", "").strip()
-
             y_offset += header_bottom_gap
-            total_text_height += header_bottom_gap
 
             for key in howto_icons:
                 if clean_header.startswith(key):
-                    text_surface.blit(howto_icons[key], (0, y_offset))
+                    blits.append((howto_icons[key], (0, y_offset)))
                     break
 
-            header_text = font_medium.render(clean_header, True, HEADER_COLOR)
-            text_surface.blit(header_text, (60, y_offset + 10))
-
+            blits.append((render_text(font_medium, clean_header, HEADER_COLOR), (60, y_offset + 10)))
             y_offset += 56
-            total_text_height += 56
             continue
 
         # ---------- SUBHEADER ----------
         if is_subheader(line, next_line):
             y_offset += 10
-            total_text_height += 10
-
-            sub = font_text.render(line, True, SUBHEADER_COLOR)
-            text_surface.blit(sub, (60, y_offset))
-
-            pygame.draw.line(
-                text_surface,
-                SUBHEADER_COLOR,
-                (60, y_offset + font_text.get_height() + 2),
-                (220, y_offset + font_text.get_height() + 2),
-                2
-            )
-
+            blits.append((render_text(font_text, line, SUBHEADER_COLOR), (60, y_offset)))
+            underlines.append(y_offset + font_text.get_height() + 2)
             y_offset += line_spacing
-            total_text_height += line_spacing
             continue
 
         # ---------- EMPTY ----------
         if line == "":
             y_offset += line_spacing // 2
-            total_text_height += line_spacing // 2
             continue
 
         # ---------- NORMAL / BULLET TEXT ----------
         color = SUBTEXT_COLOR
         x_offset = 80 if is_bullet(line) else 60
 
+        # Wrapped lines are rendered straight into the page (which is
+        # itself the cache), not through the text cache
         words = line.split(" ")
         current = ""
 
         for word in words:
             test = current + word + " "
             if font_text.size(test)[0] > max_text_width:
-                text_surface.blit(
-                    font_text.render(current, True, color),
-                    (x_offset, y_offset)
-                )
+                blits.append((font_text.render(current, True, color), (x_offset, y_offset)))
                 y_offset += line_spacing
-                total_text_height += line_spacing
                 current = word + " "
             else:
                 current = test
 
         if current.strip():
-            text_surface.blit(
-                font_text.render(current, True, color),
-                (x_offset, y_offset)
-            )
+            blits.append((font_text.render(current, True, color), (x_offset, y_offset)))
             y_offset += line_spacing
-            total_text_height += line_spacing
-
 
-    # ---------- SCROLL LIMIT ----------
-    visible_text_height = panel_height - 70 - top_padding - bottom_padding
-    max_scroll = min(0, visible_text_height - total_text_height)
+    page = pygame.Surface((width, max(1, y_offset))).convert()
+    page.fill(HOW_TO_PANEL_COLOR)  # drawn on the panel, so it can be opaque
+    page.blits(blits, doreturn=False)
+    for y in underlines:
+        pygame.draw.line(page, SUBHEADER_COLOR, (60, y), (220, y), 2)
+    return page
+
+def get_how_to_page():
+    """
+    The laid-out page, rebuilt only when the panel width or the text
+    changed.
+    """
+    global how_to_page
+    key = (HOW_TO_PANEL_WIDTH - 60, tuple(HOW_TO_PLAY_TEXT))
+    if how_to_page is None or how_to_page[0] != key:
+        how_to_page = (key, layout_how_to_play(key[0]))
+    return how_to_page[1]
+
+def scroll_how_to_play(scroll_delta):
+    global how_to_scroll, max_scroll
+    how_to_scroll += scroll_delta * scroll_speed
+    text_height = get_how_to_page().get_height() - top_padding
+    max_scroll = min(0, how_to_visible_height() - text_height)
     how_to_scroll = max(min(how_to_scroll, 0), max_scroll)
 
+def draw_how_to_play(mouse, scroll_delta=0):
+    screen.fill((18, 18, 18))
+
+    # ---------- PANEL ----------
+    panel_width = HOW_TO_PANEL_WIDTH
+    panel_height = SCREEN_HEIGHT - 150
+    panel_x = (SCREEN_WIDTH - panel_width) // 2
+    panel_y = 100
+    panel_rect = pygame.Rect(panel_x, panel_y, panel_width, panel_height)
+
+    pygame.draw.rect(screen, HOW_TO_PANEL_COLOR, panel_rect, border_radius=12)
+    pygame.draw.rect(screen, (180, 180, 180), panel_rect, 2, border_radius=12)
+
+    # ---------- TITLE ----------
+    title_surf = render_text(font_title, "HOW TO PLAY", HEADER_COLOR)
+    screen.blit(title_surf, title_surf.get_rect(center=(SCREEN_WIDTH // 2, 50)))
+
+    # ---------- SCROLL ----------
+    scroll_how_to_play(scroll_delta)
     screen.blit(
-        text_surface,
+        get_how_to_page(),
         (panel_x + 30, panel_y + 50),
-        area=pygame.Rect(0, 0, panel_width - 60, visible_text_height)
+        area=pygame.Rect(0, -how_to_scroll, panel_width - 60, how_to_visible_height())
     )
 
     # ---------- BACK BUTTON (IMAGE ONLY, TOP-LEFT) ----------
@@ -1023,11 +1036,17 @@ scroll_y=0
 running = True
 while running:
     dt = clock.tick(FPS) / 1000
+    profiler.begin_frame()
     mouse = pygame.mouse.get_pos()
 
+    profiler.start("events")
     for event in pygame.event.get():
         if event.type == pygame.QUIT:
             running = False
+        elif event.type == pygame.KEYDOWN and event.key == PROFILE_KEY:
+            show_profiler = not show_profiler
+        elif event.type == pygame.KEYDOWN and event.key == PROFILE_DUMP_KEY:
+            dump_profile()
 
         if GAME_STATE == "MENU":
             if event.type == pygame.MOUSEBUTTONDOWN:
@@ -1035,7 +1054,7 @@ while running:
                     start_new_game()
                     click_sfx.play()
                 elif menu_buttons["LEVEL"].collidepoint(event.pos):
-                    current_level_index = (current_level_index + 1) % len(LEVELS)
+                    current_level_index = (current_level_index + 1) % len(MENU_LEVELS)
                     set_level_from_index()
                     click_sfx.play()
                 elif menu_buttons["HOW TO PLAY"].collidepoint(event.pos):
@@ -1045,13 +1064,16 @@ while running:
                     click_sfx.play()
                     time.sleep(0.2)
                     running = False
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_c and has_autosave:
+                if continue_game():
+                    click_sfx.play()
 
         elif GAME_STATE == "HOWTO":
             if event.type == pygame.MOUSEBUTTONDOWN:
                 if event.button == 4:  # scroll up
-                    draw_how_to_play(pygame.mouse.get_pos(), scroll_delta=1)
+                    scroll_how_to_play(1)
                 elif event.button == 5:  # scroll down
-                    draw_how_to_play(pygame.mouse.get_pos(), scroll_delta=-1)
+                    scroll_how_to_play(-1)
                 elif back_button.collidepoint(event.pos):
                     GAME_STATE = "MENU"
                     click_sfx.play()
@@ -1078,29 +1100,14 @@ while running:
             trade_buttons = draw_trade_window(mouse)
 
             if event.type == pygame.MOUSEBUTTONDOWN:
-                if trade_buttons["FOOD_ENERGY"].collidepoint(event.pos) and inventory["FOOD"] > 0:
-                    click_sfx.play()
-                    inventory["FOOD"] -= 1
-                    energy_percentage = min(MAX_ENERGY, energy_percentage + 50)
-                elif trade_buttons["FOOD_LIGHT"].collidepoint(event.pos) and inventory["FOOD"] > 0:
-                    click_sfx.play()
-                    inventory["FOOD"] -= 1
-                    light_percentage = min(MAX_LIGHT, light_percentage + 50)
-                elif trade_buttons["FOOD_MAP"].collidepoint(event.pos) and inventory["FOOD"] > 0:
-                    click_sfx.play()
-                    inventory["FOOD"] -= 1
-                    inventory["MAP"] += 1
-                    map_count += 1
-                elif trade_buttons["MAP_ENERGY"].collidepoint(event.pos) and inventory["MAP"] > 0:
-                    click_sfx.play()
-                    inventory["MAP"] -= 1
-                    map_count = max(0, map_count - 1)
-                    energy_percentage = min(MAX_ENERGY, energy_percentage + 50)
-                elif trade_buttons["MAP_LIGHT"].collidepoint(event.pos) and inventory["MAP"] > 0:
+                traded = False
+                for key, rect in trade_buttons.items():
+                    if rect.collidepoint(event.pos):
+                        traded = session.trade(key)
+                        break
+
+                if traded:
                     click_sfx.play()
-                    inventory["MAP"] -= 1
-                    map_count = max(0, map_count - 1)
-                    light_percentage = min(MAX_LIGHT, light_percentage + 50)
                 elif trade_button.collidepoint(event.pos):
                     click_sfx.play()
                     GAME_STATE = "PLAYING"
@@ -1109,6 +1116,7 @@ while running:
             if event.type == pygame.MOUSEBUTTONDOWN:
                 if confirm_yes.collidepoint(event.pos):
                     click_sfx.play()
+                    autosave()  # can be picked up again from the menu
                     GAME_STATE = "MENU"
                 elif confirm_no.collidepoint(event.pos):
                     click_sfx.play()
@@ -1116,28 +1124,14 @@ while running:
 
         elif GAME_STATE == "MAP":
             if event.type == pygame.KEYDOWN and event.key == pygame.K_m:
-                exit_cell = find_exit_cell()
-                if exit_cell:
-                    rearrange_gates(
-                        cave,
-                        (int(player_x // BASE_CELL_SIZE), int(player_y // BASE_CELL_SIZE)),
-                        exit_cell,
-                        open_ratio=0.5
-                    )
+                session.shuffle_gates()
                 door_closing_sfx.play()
                 GAME_STATE = "PLAYING"
 
             if event.type == pygame.MOUSEBUTTONDOWN:
                 if map_button.collidepoint(event.pos):
                     click_sfx.play()
-                    exit_cell = find_exit_cell()
-                    if exit_cell:
-                        rearrange_gates(
-                            cave,
-                            (int(player_x // BASE_CELL_SIZE), int(player_y // BASE_CELL_SIZE)),
-                            exit_cell,
-                            open_ratio=0.5
-                        )
+                    session.shuffle_gates()
                     door_closing_sfx.play()
                     GAME_STATE = "PLAYING"
 
@@ -1145,18 +1139,14 @@ while running:
         elif GAME_STATE == "PLAYING":
             # Toggle map with M key
             if event.type == pygame.KEYDOWN and event.key == pygame.K_m:
-                if inventory["MAP"] > 0:
-                    inventory["MAP"] -= 1
-                    map_count = max(0, map_count - 1)
+                if session.use_map():
                     GAME_STATE = "MAP"
 
 
             # Toggle map with mouse button
             if event.type == pygame.MOUSEBUTTONDOWN:
-                if map_button.collidepoint(event.pos) and inventory["MAP"] > 0:
+                if map_button.collidepoint(event.pos) and session.use_map():
                     click_sfx.play()
-                    inventory["MAP"] -= 1
-                    map_count = max(0, map_count - 1)
                     GAME_STATE = "MAP"
                 elif trade_button.collidepoint(event.pos):
                     GAME_STATE = "TRADE"
@@ -1166,6 +1156,11 @@ while running:
                     GAME_STATE = "CONFIRM_BACK"
                     click_sfx.play()
 
+    profiler.stop("events")
+
+    # Build the next cave in the background while the player is in the menus
+    if GAME_STATE in ("MENU", "HOWTO", "WIN", "GAMEOVER"):
+        cave_pregen.prepare(LEVEL)
 
     # ----------------
     # DRAWING & MOVEMENT
@@ -1186,7 +1181,7 @@ while running:
         draw_map(
             screen,
             cave,
-            (int(player_x // BASE_CELL_SIZE), int(player_y // BASE_CELL_SIZE)),
+            session.player_cell(),
             (SCREEN_WIDTH, SCREEN_HEIGHT)
         )
         # Draw active map button
@@ -1203,7 +1198,7 @@ while running:
         # Draw frozen game background
         draw_world()
         draw_light_overlay()
-        draw_bar(10, SCREEN_HEIGHT - 70, energy_percentage, "Energy", (255, 120, 120))
+        draw_bar(10, SCREEN_HEIGHT - 70, session.energy_percentage, "Energy", (255, 120, 120))
         back_button = draw_back_button()
 
         # Draw confirmation popup
@@ -1213,115 +1208,59 @@ while running:
 
     elif GAME_STATE == "PLAYING":
         keys = pygame.key.get_pressed()
-        speed = MIN_MOVE_SPEED + (MAX_MOVE_SPEED - MIN_MOVE_SPEED) * (energy_percentage / 100)
-
-        dx = dy = 0
-        moving = False
 
+        move = None
         if keys[pygame.K_LEFT]:
-            dx = -speed * dt; player_direction = "left"; moving = True
+            move = "left"
         elif keys[pygame.K_RIGHT]:
-            dx = speed * dt; player_direction = "right"; moving = True
+            move = "right"
         elif keys[pygame.K_UP]:
-            dy = -speed * dt; player_direction = "up"; moving = True
+            move = "up"
         elif keys[pygame.K_DOWN]:
-            dy = speed * dt; player_direction = "down"; moving = True
-
-        if can_move_pixel(player_x + dx, player_y):
-            player_x += dx
-        if can_move_pixel(player_x, player_y + dy):
-            player_y += dy
-
-        if moving:
-            animation_timer += dt
-            if animation_timer >= ANIM_SPEED:
-                animation_timer = 0
-                animation_frame = (animation_frame + 1) % FRAMES
+            move = "down"
+
+        # Movement, light/energy drain, items, enemies and win/lose checks,
+        # in fixed steps (none, one or several this frame)
+        GAME_STATE = stepper.advance(dt, move)
+        if GAME_STATE == "PLAYING":
+            autosave_timer += dt
+            if autosave_timer >= AUTOSAVE_SECONDS:
+                with profiler.phase("autosave"):
+                    autosave()
         else:
-            animation_frame = 0
-
-        # Decrease light and energy
-        light_percentage = max(MIN_LIGHT, light_percentage - LIGHT_DRAIN_PER_SEC * dt)
-        energy_percentage = max(MIN_ENERGY, energy_percentage - ENERGY_DRAIN_PER_SEC * dt)
-        if energy_percentage <= 0:
-            GAME_STATE = "GAMEOVER"
-
-
-        # --------------------------
-        # ITEM COLLECTION LOGIC
-        # --------------------------
-        px_cell = int(player_x // BASE_CELL_SIZE)
-        py_cell = int(player_y // BASE_CELL_SIZE)
-
-        if cave[py_cell][px_cell] in (LIGHT, FOOD, MAP, EXIT):
+            remove_autosave()  # the run is over, nothing to continue
+        if "reward" in stepper.events:
             reward_sfx.play()
-            item = cave[py_cell][px_cell]
-            cave[py_cell][px_cell] = FLOOR  # Remove the item from the cave
-
-            if item == EXIT:
-                GAME_STATE = "WIN"
-            elif item == LIGHT:
-                light_percentage = min(MAX_LIGHT, light_percentage + 50)
-            elif item == FOOD:
-                if energy_percentage > 50:
-                    # Store in inventory
-                    inventory["FOOD"] += 1
-                else:
-                    # Consume immediately
-                    energy_percentage = min(MAX_ENERGY, energy_percentage + 50)
-            elif item == MAP:
-                if energy_percentage > 50:
-                    inventory["MAP"] += 1
-                    map_count += 1
-                else:
-                    map_count += 10
-
-                
+        if "recenter" in stepper.events:
+            # A streaming level moved its window: the cave was refilled
+            gate_horizontal, _ = corridor_masks(cave)
+            tile_layer.invalidate()
 
         # Drawing
-        draw_world()
-        draw_light_overlay()
-        draw_bar(10, SCREEN_HEIGHT - 70, energy_percentage, "Energy", (255, 120, 120))
-        back_button = draw_back_button()
-
-        # --------------------------
-        # ENEMY LOGIC
-        # --------------------------
-        for enemy in enemies:
-            if light_percentage >= ENEMY_TRIGGER_LIGHT:
-                dx = player_x - enemy["x"]
-                dy = player_y - enemy["y"]
-                dist = (dx**2 + dy**2) ** 0.5
-                if dist != 0:
-                    move_dist = ENEMY_SPEED * dt
-                    step_x = dx / dist * move_dist
-                    step_y = dy / dist * move_dist
-
-                    # Update facing direction by horizontal intent
-                    if step_x > 0:
-                        enemy["dir"] = "right"
-                    elif step_x < 0:
-                        enemy["dir"] = "left"
-
-                    # Move separately in x and y, checking collisions
-                    if can_move_pixel(enemy["x"] + step_x, enemy["y"]):
-                        enemy["x"] += step_x
-                    if can_move_pixel(enemy["x"], enemy["y"] + step_y):
-                        enemy["y"] += step_y
-
-                # Collision with player
-                if abs(enemy["x"] - player_x) < player_radius and abs(enemy["y"] - player_y) < player_radius:
-                    GAME_STATE = "GAMEOVER"
-
-
-        map_button = draw_map_button()
-        trade_button = draw_trade_button()
-
-        # Make map button blurry if no maps left
-        if inventory["MAP"] == 0:
-            draw_blurred_button(map_btn_img, map_button)
-
-
-    pygame.display.flip()
-
+        with profiler.phase("draw_world"):
+            draw_world()
+        with profiler.phase("light"):
+            draw_light_overlay()
+        with profiler.phase("ui"):
+            draw_bar(10, SCREEN_HEIGHT - 70, session.energy_percentage, "Energy", (255, 120, 120))
+            back_button = draw_back_button()
+
+            map_button = draw_map_button()
+            trade_button = draw_trade_button()
+
+            # Make map button blurry if no maps left
+            if session.inventory["MAP"] == 0:
+                draw_blurred_button(map_btn_img, map_button)
+
+    if show_profiler:
+        with profiler.phase("profiler"):
+            draw_profiler()
+
+    with profiler.phase("flip"):
+        pygame.display.flip()
+    profiler.end_frame()
+
+if session is not None and session.state == "PLAYING":
+    autosave()
+cave_pregen.shutdown()
 pygame.quit()
@@ -1,5 +1,9 @@
+import numpy as np
 import pygame
 
+from grid import grid_size
+from text_cache import get_font, render_text
+
 # Tile constants
 WALL = 1
 FLOOR = 0
@@ -10,9 +14,70 @@ LIGHT = 5
 GATE_CLOSED = 6
 GATE_OPEN = 7
 
+# Minimap colours per tile. Item tiles share the default dark colour and
+# get a coloured dot on top.
+MAP_PALETTE = np.array([
+    (120, 120, 120),  # FLOOR
+    (60, 35, 20),     # WALL
+    (0, 200, 0),      # EXIT
+    (30, 30, 30),     # MAP
+    (30, 30, 30),     # FOOD
+    (30, 30, 30),     # LIGHT
+    (0, 0, 0),        # GATE_CLOSED
+    (255, 255, 255),  # GATE_OPEN
+], dtype=np.uint8)
+
+ITEM_COLORS = {
+    MAP: (0, 150, 255),
+    FOOD: (255, 100, 0),
+    LIGHT: (255, 255, 50),
+}
+
+# Cached overview: rebuilt only when the cave or the cell size changes
+_map_cache = {
+    "cave": None,
+    "cell_size": None,
+    "snapshot": None,
+    "surface": None,
+}
+
+
+def render_map_surface(cave, cell_size):
+    """
+    Render the whole cave into a surface with cell_size pixels per cell.
+    """
+    rgb = MAP_PALETTE[cave]
+    rgb = rgb.repeat(cell_size, axis=0).repeat(cell_size, axis=1)
+    # surfarray is indexed [x, y]
+    surface = pygame.surfarray.make_surface(rgb.transpose(1, 0, 2)).convert()
+
+    # Draw items as small circles
+    circle_radius = cell_size // 3
+    for item, color in ITEM_COLORS.items():
+        ys, xs = np.nonzero(cave == item)
+        for x, y in zip(xs.tolist(), ys.tolist()):
+            circle_center = (
+                x * cell_size + cell_size // 2,
+                y * cell_size + cell_size // 2
+            )
+            pygame.draw.circle(surface, color, circle_center, circle_radius)
+
+    return surface
+
+
+def get_map_surface(cave, cell_size):
+    cache = _map_cache
+    if (cache["cave"] is not cave or cache["cell_size"] != cell_size
+            or not np.array_equal(cache["snapshot"], cave)):
+        cache["cave"] = cave
+        cache["cell_size"] = cell_size
+        cache["snapshot"] = cave.copy()
+        cache["surface"] = render_map_surface(cave, cell_size)
+    return cache["surface"]
+
+
 def draw_map(screen, cave, player_pos, screen_size):
-    rows = len(cave)
-    cols = len(cave[0])
+    rows, cols = grid_size(cave)
 
     map_margin = 40
     map_width = screen_size[0] - map_margin * 2
@@ -20,52 +85,13 @@ def draw_map(screen, cave, player_pos, screen_size):
 
     cell_w = map_width // cols
     cell_h = map_height // rows
-    cell_size = min(cell_w, cell_h)
+    cell_size = max(1, min(cell_w, cell_h))
 
     offset_x = (screen_size[0] - (cols * cell_size)) // 2
     offset_y = (screen_size[1] - (rows * cell_size)) // 2
 
-    # Draw map cells
-    for y in range(rows):
-        for x in range(cols):
-            cell = cave[y][x]
-
-            # Wall or floor
-            color = (30, 30, 30)  # wall
-            if cell == FLOOR:
-                color = (120, 120, 120)
-            elif cell == WALL:
-                color = (60,35,20)
-            elif cell == EXIT:
-                color = (0, 200, 0)  # exit
-            elif cell == GATE_CLOSED:
-                color = (0,0,0)
-            elif cell == GATE_OPEN:
-                color = (255,255,255)
-
-            rect = pygame.Rect(
-                offset_x + x * cell_size,
-                offset_y + y * cell_size,
-                cell_size,
-                cell_size
-            )
-            pygame.draw.rect(screen, color, rect)
-
-            # Draw items as small circles
-            circle_radius = cell_size // 3
-            circle_center = (
-                offset_x + x * cell_size + cell_size // 2,
-                offset_y + y * cell_size + cell_size // 2
-            )
-
-        
-
-            if cell == MAP:
-                pygame.draw.circle(screen, (0, 150, 255), circle_center, circle_radius)
-            elif cell == FOOD:
-                pygame.draw.circle(screen, (255, 100, 0), circle_center, circle_radius)
-            elif cell == LIGHT:
-                pygame.draw.circle(screen, (255, 255, 50), circle_center, circle_radius)
+    # Draw map cells (cached, only rebuilt when the cave changes)
+    screen.blit(get_map_surface(cave, cell_size), (offset_x, offset_y))
 
     # Draw player as a square (like before)
     px, py = player_pos
@@ -98,7 +124,7 @@ def draw_map(screen, cave, player_pos, screen_size):
 
 
 def draw_map_legend(screen, start_x, start_y):
-    font = pygame.font.SysFont(None, 22)
+    font = get_font(None, 22)
     spacing = 26
 
     legend_items = [
@@ -121,5 +147,5 @@ def draw_map_legend(screen, start_x, start_y):
         pygame.draw.rect(screen, (200, 200, 200), (start_x, y, 18, 18), 1)
 
         # text
-        text = font.render(label, True, (220, 220, 220))
+        text = render_text(font, label, (220, 220, 220))
         screen.blit(text, (start_x + 26, y - 2))
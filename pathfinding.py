@@ -0,0 +1,260 @@
+import heapq
+from array import array
+
+import numpy as np
+
+from gridsearch import grid_search, UNREACHED
+
+# ======================
+# TILE CONSTANTS
+# ======================
+
+WALL = 1
+GATE_CLOSED = 6
+
+# Tiles an enemy cannot walk through
+ENEMY_BLOCKING = (WALL, GATE_CLOSED)
+
+
+# ----------------------
+# Flow field
+# ----------------------
+class FlowField:
+    """
+    Shared chase directions toward one target cell. One BFS from the
+    target gives every cell its distance; each cell then points to the
+    neighbour one step closer. Any number of enemies can follow it with an
+    array lookup.
+
+    Moving the target rebuilds the field. Cells that change tile (gates
+    toggled, items picked up) are passed to update_cells, which repairs
+    only the distances that depend on them.
+    """
+
+    def __init__(self, cave, blocking=ENEMY_BLOCKING):
+        self.cave = cave
+        self.blocking = blocking
+        self.rows, self.cols = cave.shape
+        self.width = self.cols + 2
+        self.offsets = (-self.width, 1, self.width, -1)  # up, right, down, left
+        self.target = None
+        self.search = grid_search(self.rows, self.cols)  # same flat layout as the field
+        self.passable = self.search.passable(cave, blocking)
+        self.flat_dist = None   # distances over the padded grid (int32 array)
+        self.dist = None        # (rows, cols) view of flat_dist
+        self.step_x = np.zeros(cave.shape, dtype=np.int8)
+        self.step_y = np.zeros(cave.shape, dtype=np.int8)
+
+    def _index(self, cell):
+        x, y = cell
+        return (y + 1) * self.width + x + 1
+
+    def _cell(self, i):
+        y, x = divmod(i, self.width)
+        return x - 1, y - 1
+
+    def invalidate(self):
+        """
+        Force a full rebuild on the next update, for changes to the cave
+        that were not reported through update_cells.
+        """
+        self.target = None
+        self.passable = self.search.passable(self.cave, self.blocking)
+
+    def update(self, target):
+        """
+        Point the field at target (x, y); rebuilds only if it changed.
+        """
+        if target == self.target:
+            return
+        self.target = target
+        if self.passable[self._index(target)]:
+            self.search.run(self.passable, target)
+            self.flat_dist = array("i", self.search.dist)
+        else:
+            self.flat_dist = array("i", [UNREACHED]) * len(self.passable)
+        self.dist = np.frombuffer(self.flat_dist, dtype=np.int32).reshape(
+            self.rows + 2, self.width)[1:-1, 1:-1]
+        self._build_steps()
+
+    def _build_steps(self):
+        dist = self.dist
+        big = np.iinfo(np.int32).max
+        padded = np.full((dist.shape[0] + 2, dist.shape[1] + 2), big, dtype=np.int32)
+        padded[1:-1, 1:-1] = np.where(dist == UNREACHED, big, dist)
+
+        # Neighbour distances in the order up, right, down, left
+        neighbours = np.stack([
+            padded[:-2, 1:-1],
+            padded[1:-1, 2:],
+            padded[2:, 1:-1],
+            padded[1:-1, :-2],
+        ])
+        best = neighbours.argmin(axis=0)
+        downhill = (neighbours.min(axis=0) < dist) & (dist > 0)
+
+        step_x = np.array([0, 1, 0, -1], dtype=np.int8)[best]
+        step_y = np.array([-1, 0, 1, 0], dtype=np.int8)[best]
+        self.step_x = np.where(downhill, step_x, 0).astype(np.int8)
+        self.step_y = np.where(downhill, step_y, 0).astype(np.int8)
+
+    # ----------------
+    # INCREMENTAL UPDATES
+    # ----------------
+
+    def update_cells(self, cells):
+        """
+        Repair the field after the tiles at cells (x, y) changed in the
+        cave. Cells whose passability did not change cost nothing; the
+        rest only touch the region whose distance actually changes. If
+        that region turns out to be a large part of the cave, a plain
+        rebuild is cheaper and is done instead.
+        """
+        if self.target is None:
+            self.invalidate()
+            return
+
+        target = self._index(self.target)
+        opened, closed = [], []
+        for x, y in cells:
+            i = self._index((x, y))
+            passable = int(self.cave[y, x] not in self.blocking)
+            if passable != self.passable[i]:
+                self.passable[i] = passable
+                (opened if passable else closed).append(i)
+        if not opened and not closed:
+            return
+
+        lost = self._close(closed) if target not in closed and target not in opened else None
+        if lost is None:
+            target, self.target = self.target, None
+            self.update(target)
+            return
+
+        changed = self._relax(opened + list(lost))
+        if changed is None:
+            target, self.target = self.target, None
+            self.update(target)
+            return
+        changed.update(closed)
+        self._sync(changed)
+
+    def _close(self, closed):
+        """
+        Clear the distance of every cell whose shortest paths all ran
+        through a closed cell, and return those cells (None if there are
+        too many to be worth repairing).
+        """
+        dist = self.flat_dist
+        limit = self._repair_limit()
+
+        # A cell is lost when no neighbour one step closer is left.
+        # Candidates are visited closest first, so every closer cell has
+        # been decided before it is used as support.
+        heap = []
+        for i in closed:
+            d = dist[i]
+            if d != UNREACHED:
+                dist[i] = UNREACHED
+                heap.extend((d + 1, j) for j in self._neighbours(i) if dist[j] == d + 1)
+        heapq.heapify(heap)
+
+        lost = set()
+        while heap:
+            d, c = heapq.heappop(heap)
+            if c in lost:
+                continue
+            if any(dist[j] == d - 1 and j not in lost for j in self._neighbours(c)):
+                continue
+            lost.add(c)
+            if len(lost) > limit:
+                return None
+            for j in self._neighbours(c):
+                if dist[j] == d + 1:
+                    heapq.heappush(heap, (d + 1, j))
+
+        for c in lost:
+            dist[c] = UNREACHED
+        return lost
+
+    def _relax(self, seeds):
+        """
+        Give each seed cell (opened or lost) the best distance offered by
+        its neighbours and spread any improvement outward. Returns the
+        cells whose distance changed (None if there are too many).
+        """
+        dist = self.flat_dist
+        limit = self._repair_limit()
+        changed = set(seeds)
+        heap = []
+        for c in seeds:
+            known = [dist[j] for j in self._neighbours(c) if dist[j] != UNREACHED]
+            if known:
+                dist[c] = min(known) + 1
+                heap.append((dist[c], c))
+        heapq.heapify(heap)
+
+        while heap:
+            d, c = heapq.heappop(heap)
+            if d != dist[c]:
+                continue
+            for j in self._neighbours(c):
+                if dist[j] == UNREACHED or dist[j] > d + 1:
+                    dist[j] = d + 1
+                    changed.add(j)
+                    heapq.heappush(heap, (d + 1, j))
+            if len(changed) > limit:
+                return None
+        return changed
+
+    def _repair_limit(self):
+        # Repairs cost several times more per cell than a plain BFS, so
+        # past this many cells a rebuild is the faster way.
+        return self.rows * self.cols // 32
+
+    def _neighbours(self, i):
+        return [i + o for o in self.offsets if self.passable[i + o]]
+
+    def _sync(self, changed):
+        """
+        Redo the steps of the changed cells and their neighbours, with the
+        same tie-break (up, right, down, left) as _build_steps.
+        """
+        dist = self.flat_dist
+        around = set(changed)
+        for c in changed:
+            around.update(c + o for o in self.offsets)
+
+        for c in around:
+            x, y = self._cell(c)
+            if not (0 <= x < self.cols and 0 <= y < self.rows):
+                continue
+            d = dist[c]
+            step = 0
+            if d > 0:
+                best = d
+                for o in self.offsets:
+                    n = dist[c + o]
+                    if n != UNREACHED and n < best:
+                        best, step = n, o
+            self.step_x[y, x] = 1 if step == 1 else -1 if step == -1 else 0
+            self.step_y[y, x] = 1 if step == self.width else -1 if step == -self.width else 0
+
+    def steer_targets(self, xs, ys, cell_size, fallback_x, fallback_y):
+        """
+        For world positions (xs, ys), the point each should move toward:
+        the centre of the next cell along the field. Positions in the
+        target cell or where the field has no direction (unreachable)
+        get (fallback_x, fallback_y).
+        """
+        rows, cols = self.cave.shape
+        cx = np.clip(np.floor_divide(xs, cell_size).astype(np.intp), 0, cols - 1)
+        cy = np.clip(np.floor_divide(ys, cell_size).astype(np.intp), 0, rows - 1)
+        sx = self.step_x[cy, cx]
+        sy = self.step_y[cy, cx]
+        has_step = (sx != 0) | (sy != 0)
+
+        half = cell_size / 2
+        tx = np.where(has_step, (cx + sx) * cell_size + half, fallback_x)
+        ty = np.where(has_step, (cy + sy) * cell_size + half, fallback_y)
+        return tx, ty
@@ -0,0 +1,112 @@
+import multiprocessing
+from concurrent.futures import BrokenExecutor, ProcessPoolExecutor, ThreadPoolExecutor
+
+from levels import pick_seed
+from simulation import generate_level, start_session, BASE_CELL_SIZE
+
+# ----------------------
+# Background cave pre-generation
+# ----------------------
+# While the player sits in a menu, the cave of the next game of the
+# selected level is generated in a worker process, so NEW GAME only has to
+# spawn the enemies and start the session on it.
+#
+# Workers hand back plain data (the cave array, spawn and exit cells, see
+# simulation.generate_level); the session itself is always built here in
+# the game process.
+#
+# Workers are forked: main.py runs the game at import time, so start
+# methods that re-import the main module (spawn, forkserver) cannot be
+# used. Forking a process that already runs pygame's audio and display
+# threads can leave the child stuck on a lock one of them held, so the
+# worker is forked by start(), which main.py calls before pygame.init().
+# Any pool made later (after a worker died), or where fork is unavailable,
+# uses a background thread instead.
+
+
+def _generate(level, seed, cache):
+    return generate_level(level, seed, cache)
+
+
+def _warm_up():
+    return None
+
+
+class CavePregenerator:
+    def __init__(self, cell_size=BASE_CELL_SIZE, cache=None):
+        self.cell_size = cell_size
+        self.cache = cache    # CaveCache shared with the workers (on disk)
+        self.executor = None
+        self.level = None     # level and seed of the pending build
+        self.seed = None
+        self.future = None
+
+    def start(self):
+        """
+        Fork the worker process now. Call before any threads are started
+        (pygame.init), so the fork is safe.
+        """
+        if self.executor is None and "fork" in multiprocessing.get_all_start_methods():
+            self.executor = ProcessPoolExecutor(max_workers=1,
+                                                mp_context=multiprocessing.get_context("fork"))
+            # The pool only forks its worker once it has work
+            self.executor.submit(_warm_up).result()
+
+    def prepare(self, level):
+        """
+        Make sure a cave for level is being generated. Cheap to call every
+        frame; a pending build for another level is discarded.
+        """
+        if self.future is not None and self.level == level:
+            return
+        self.discard()
+        seed = pick_seed(level)
+        try:
+            future = self._submit(level, seed)
+        except BrokenExecutor:
+            # The worker died since the last build; carry on in a thread
+            self.executor = None
+            future = self._submit(level, seed)
+        self.level = level
+        self.seed = seed
+        self.future = future
+
+    def _submit(self, level, seed):
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(max_workers=1)
+        return self.executor.submit(_generate, level, seed, self.cache)
+
+    def discard(self):
+        if self.future is not None:
+            self.future.cancel()
+        self.level = None
+        self.seed = None
+        self.future = None
+
+    def take(self, level):
+        """
+        Return a new GameSession for level: on the pre-generated cave if it
+        is for this level (waiting for it if still running), otherwise on
+        one generated right away.
+        """
+        if self.future is not None and self.level == level:
+            future, seed = self.future, self.seed
+            self.level = self.seed = self.future = None
+            try:
+                cave, spawn, _ = future.result()
+                return start_session(level, seed, cave, spawn, self.cell_size)
+            except BrokenExecutor:
+                # The worker died; use a thread from now on and generate
+                # this one here.
+                self.executor = None
+        else:
+            self.discard()
+        seed = pick_seed(level)
+        cave, spawn, _ = generate_level(level, seed, self.cache)
+        return start_session(level, seed, cave, spawn, self.cell_size)
+
+    def shutdown(self):
+        self.discard()
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
@@ -0,0 +1,156 @@
+import csv
+import json
+import time
+
+import numpy as np
+
+# ----------------------
+# Frame profiler
+# ----------------------
+# Time spent in each phase of a frame (event handling, simulation steps,
+# drawing, ...) for the last few hundred frames, kept in a fixed-size ring
+# buffer so profiling can stay on in the field at no memory cost. Phases
+# are timed with
+#
+#     with profiler.phase("draw_world"):
+#         draw_world()
+#
+# and a phase entered several times in one frame (e.g. a simulation phase
+# run by several fixed steps) adds up. Time in no phase is kept as "other",
+# and "frame" is the whole time between two frames, waiting included.
+
+
+class FrameProfiler:
+    def __init__(self, phases, frames=300):
+        self.phases = list(phases)
+        self.columns = self.phases + ["other", "busy", "frame"]
+        self.times = np.zeros((frames, len(self.columns)))   # milliseconds
+        self.count = 0        # frames recorded so far (may exceed frames)
+        self._slot = {name: i for i, name in enumerate(self.phases)}
+        self._current = np.zeros(len(self.phases))
+        self._started = [0.0] * len(self.phases)
+        self._frame_start = None
+        self._last_start = None
+
+    def begin_frame(self):
+        now = time.perf_counter()
+        self._current[:] = 0
+        self._frame_start = now
+        if self._last_start is None:
+            self._last_start = now
+
+    def end_frame(self):
+        """
+        Record the frame started by begin_frame into the ring buffer.
+        """
+        if self._frame_start is None:
+            return
+        now = time.perf_counter()
+        busy = (now - self._frame_start) * 1000
+        row = self.times[self.count % len(self.times)]
+        row[:len(self.phases)] = self._current * 1000
+        row[-3] = max(0.0, busy - row[:len(self.phases)].sum())
+        row[-2] = busy
+        row[-1] = (now - self._last_start) * 1000
+        self._last_start = now
+        self._frame_start = None
+        self.count += 1
+
+    def phase(self, name):
+        """
+        Context manager timing the code in it as part of phase name.
+        """
+        return _Phase(self, self._slot[name])
+
+    def start(self, name):
+        """
+        Like entering phase(name), for code that is not one block.
+        """
+        self._started[self._slot[name]] = time.perf_counter()
+
+    def stop(self, name):
+        slot = self._slot[name]
+        self._current[slot] += time.perf_counter() - self._started[slot]
+
+    def history(self):
+        """
+        Recorded frames as a (frames, columns) array in milliseconds,
+        oldest first.
+        """
+        size = len(self.times)
+        if self.count <= size:
+            return self.times[:self.count].copy()
+        start = self.count % size
+        return np.concatenate([self.times[start:], self.times[:start]])
+
+    def summary(self):
+        """
+        Mean and max milliseconds of each column over the recorded frames.
+        """
+        history = self.history()
+        if not len(history):
+            return {}
+        return {name: {"mean": float(history[:, i].mean()), "max": float(history[:, i].max())}
+                for i, name in enumerate(self.columns)}
+
+    def dump(self, path):
+        """
+        Write the recorded frames to path: JSON if it ends in .json, else
+        CSV with one row per frame.
+        """
+        history = self.history()
+        first = self.count - len(history)
+        if path.endswith(".json"):
+            data = {
+                "columns": self.columns,
+                "first_frame": first,
+                "summary": self.summary(),
+                "frames": np.round(history, 4).tolist(),
+            }
+            with open(path, "w") as f:
+                json.dump(data, f)
+            return
+        with open(path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["frame_number"] + [f"{name}_ms" for name in self.columns])
+            for n, row in enumerate(history.tolist(), start=first):
+                writer.writerow([n] + [f"{value:.4f}" for value in row])
+
+
+class _Phase:
+    __slots__ = ("profiler", "slot", "start")
+
+    def __init__(self, profiler, slot):
+        self.profiler = profiler
+        self.slot = slot
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc):
+        self.profiler._current[self.slot] += time.perf_counter() - self.start
+
+
+class _NoPhase:
+    __slots__ = ()
+
+    def __enter__(self):
+        pass
+
+    def __exit__(self, *exc):
+        pass
+
+
+class NullProfiler:
+    """
+    Stand-in for a FrameProfiler that records nothing, for code that is
+    timed only when something is profiling it.
+    """
+
+    _phase = _NoPhase()
+
+    def phase(self, name):
+        return self._phase
+
+
+NO_PROFILER = NullProfiler()
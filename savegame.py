@@ -0,0 +1,240 @@
+import math
+import mmap
+import os
+import random
+import struct
+from collections import namedtuple
+
+import numpy as np
+
+from enemies import EnemyPool
+from grid import TILE_DTYPE
+from levels import STREAMING_LEVELS, make_level_world
+from simulation import GameSession, StreamingSession, DIRECTIONS, MAX_LIGHT, MAX_ENERGY
+
+# ----------------------
+# Save files
+# ----------------------
+# Layout (little endian), every section starting on an 8-byte boundary:
+#
+#   header    magic, format version
+#   state     player, light/energy, inventory, level, seed, sizes, ...
+#   rng       gate shuffle Random state (625 uint32 words)
+#   cave      TILE_BITS bit planes of rows * cols bits (np.packbits)
+#   enemies   ENEMY_DTYPE records
+#
+# Loading maps the file and reads each section in place, so resuming a big
+# world does not parse anything per cell in Python.
+
+MAGIC = b"CAVESAVE"
+SAVE_VERSION = 1
+
+TILE_BITS = 3   # every tile value fits in 3 bits
+
+HEADER = struct.Struct("<8sH6x")
+STATE = struct.Struct(
+    "<16s"      # level name
+    "q"         # seed (-1 if unknown)
+    "III"       # rows, cols, cell size
+    "dd"        # player x, y
+    "BBxx"      # player direction, streaming flag
+    "ii"        # window origin (streaming levels)
+    "I"         # window span (streaming levels)
+    "ddd"       # light, energy, time
+    "iiiI"      # map count, FOOD, MAP, enemy tick
+    "I"         # enemy count
+    "d"         # rng gauss_next (NaN if None)
+)
+SavedState = namedtuple("SavedState", [
+    "level", "seed", "rows", "cols", "cell_size", "player_x", "player_y",
+    "direction", "streaming", "origin_x", "origin_y", "span",
+    "light", "energy", "time", "map_count", "food", "maps", "enemy_tick",
+    "enemy_count", "gauss_next",
+])
+RNG_WORDS = 625
+
+ENEMY_DTYPE = np.dtype([("x", "<f8"), ("y", "<f8"), ("facing", "i1")])
+
+DIRECTION_NAMES = list(DIRECTIONS)
+
+MAX_CELL_SIZE = 4096  # world pixels per cell; anything bigger is a damaged file
+
+
+def _aligned(offset):
+    return (offset + 7) & ~7
+
+
+def _layout(rows, cols, enemy_count):
+    """
+    Byte offsets of the rng, cave and enemy sections, and the file size.
+    """
+    plane = (rows * cols + 7) // 8
+    rng_at = _aligned(HEADER.size + STATE.size)
+    cave_at = _aligned(rng_at + RNG_WORDS * 4)
+    enemies_at = _aligned(cave_at + TILE_BITS * plane)
+    end = enemies_at + enemy_count * ENEMY_DTYPE.itemsize
+    return rng_at, cave_at, enemies_at, end
+
+
+# ----------------------
+# Saving
+# ----------------------
+def pack_cave(cave):
+    """
+    The cave as TILE_BITS bit planes, lowest bit first.
+    """
+    flat = cave.ravel()
+    if flat.size and flat.max() >= 1 << TILE_BITS:
+        raise ValueError(f"tile values must be below {1 << TILE_BITS}")
+    return np.concatenate([np.packbits((flat >> bit) & 1) for bit in range(TILE_BITS)])
+
+
+def save_session(session, path):
+    """
+    Write session to path. The file is replaced atomically, so a crash
+    while autosaving never leaves a broken save behind.
+    """
+    rows, cols = session.cave.shape
+    enemies = session.enemies
+    rng_at, cave_at, enemies_at, end = _layout(rows, cols, len(enemies))
+
+    _, words, gauss_next = session.rng.getstate()
+    streaming = isinstance(session, StreamingSession)
+    origin = session.origin if streaming else (0, 0)
+
+    buf = bytearray(end)
+    HEADER.pack_into(buf, 0, MAGIC, SAVE_VERSION)
+    STATE.pack_into(
+        buf, HEADER.size,
+        (session.level or "").encode(),
+        -1 if session.seed is None else session.seed,
+        rows, cols, session.cell_size,
+        session.player_x, session.player_y,
+        DIRECTION_NAMES.index(session.player_direction), streaming,
+        origin[0], origin[1], session.span if streaming else 0,
+        session.light_percentage, session.energy_percentage, session.time,
+        session.map_count, session.inventory["FOOD"], session.inventory["MAP"], session.enemy_tick,
+        len(enemies),
+        math.nan if gauss_next is None else gauss_next,
+    )
+    buf[rng_at:rng_at + RNG_WORDS * 4] = np.array(words, dtype="<u4").tobytes()
+
+    packed = pack_cave(session.cave)
+    buf[cave_at:cave_at + packed.size] = packed.tobytes()
+
+    records = np.empty(len(enemies), dtype=ENEMY_DTYPE)
+    records["x"] = enemies.x
+    records["y"] = enemies.y
+    records["facing"] = enemies.facing
+    buf[enemies_at:end] = records.tobytes()
+
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(buf)
+    os.replace(tmp, path)
+
+
+# ----------------------
+# Loading
+# ----------------------
+def _read(data):
+    """
+    Parse the sections of a save file. Raises ValueError for anything
+    that is not a complete save of this version.
+    """
+    if len(data) < HEADER.size:
+        raise ValueError("not a save file")
+    magic, version = HEADER.unpack_from(data, 0)
+    if magic != MAGIC:
+        raise ValueError("not a save file")
+    if version != SAVE_VERSION:
+        raise ValueError(f"unsupported save version {version} (expected {SAVE_VERSION})")
+    if len(data) < HEADER.size + STATE.size:
+        raise ValueError("save file is truncated")
+
+    state = SavedState._make(STATE.unpack_from(data, HEADER.size))
+    _check_state(state)
+    rows, cols = state.rows, state.cols
+    rng_at, cave_at, enemies_at, end = _layout(rows, cols, state.enemy_count)
+    if len(data) < end:
+        raise ValueError("save file is truncated")
+
+    words = tuple(np.frombuffer(data, dtype="<u4", count=RNG_WORDS, offset=rng_at).tolist())
+
+    plane = (rows * cols + 7) // 8
+    planes = np.frombuffer(data, dtype=np.uint8, count=TILE_BITS * plane, offset=cave_at)
+    cave = np.zeros(rows * cols, dtype=TILE_DTYPE)
+    for bit in range(TILE_BITS):
+        bits = np.unpackbits(planes[bit * plane:(bit + 1) * plane], count=rows * cols)
+        cave |= bits.astype(TILE_DTYPE) << bit
+
+    records = np.frombuffer(data, dtype=ENEMY_DTYPE, count=state.enemy_count, offset=enemies_at).copy()
+    if not (np.isfinite(records["x"]).all() and np.isfinite(records["y"]).all()):
+        raise ValueError("bad enemy positions in save file")
+    return state, words, cave.reshape(rows, cols), records
+
+
+def _check_state(state):
+    if state.rows == 0 or state.cols == 0:
+        raise ValueError("save file has an empty cave")
+    if not 0 < state.cell_size <= MAX_CELL_SIZE:
+        raise ValueError(f"bad cell size {state.cell_size} in save file")
+    if state.direction >= len(DIRECTION_NAMES):
+        raise ValueError(f"bad player direction {state.direction} in save file")
+    if state.streaming not in (0, 1):
+        raise ValueError(f"bad streaming flag {state.streaming} in save file")
+    if state.streaming and (state.span == 0 or state.rows != state.cols or state.rows % state.span):
+        raise ValueError("bad streaming window in save file")
+    if not all(math.isfinite(v) for v in (state.player_x, state.player_y, state.light,
+                                          state.energy, state.time)):
+        raise ValueError("bad player state in save file")
+    if not (0 <= state.light <= MAX_LIGHT and 0 <= state.energy <= MAX_ENERGY and state.time >= 0):
+        raise ValueError("bad light, energy or time in save file")
+    if not (0 <= state.player_x < state.cols * state.cell_size
+            and 0 <= state.player_y < state.rows * state.cell_size):
+        raise ValueError("player is outside the cave in save file")
+    if min(state.map_count, state.food, state.maps) < 0:
+        raise ValueError("bad inventory in save file")
+
+
+def load_session(path):
+    """
+    Read a session saved with save_session.
+    """
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        state, words, cave, records = _read(data)
+
+    level = state.level.rstrip(b"\0").decode() or None   # UnicodeDecodeError is a ValueError
+    seed = None if state.seed < 0 else state.seed
+    cell_size = state.cell_size
+
+    rng = random.Random()
+    rng.setstate((3, words, None if math.isnan(state.gauss_next) else state.gauss_next))
+
+    enemies = EnemyPool(records["x"], records["y"])
+    enemies.facing[:] = records["facing"]
+
+    if state.streaming:
+        if level not in STREAMING_LEVELS:
+            raise ValueError(f"unknown streaming level {level!r}")
+        world = make_level_world(level, seed)
+        origin, span = (state.origin_x, state.origin_y), state.span
+        if cave.shape != (span * world.size, span * world.size):
+            raise ValueError("save file window does not match the level's chunks")
+        world.adopt(origin, span, cave)
+        session = StreamingSession(world, origin, span, cave, (0, 0), enemies, cell_size,
+                                   rng=rng, seed=seed, level=level)
+    else:
+        session = GameSession(cave, (0, 0), enemies, cell_size, rng=rng, seed=seed, level=level)
+
+    session.player_x = state.player_x
+    session.player_y = state.player_y
+    session.player_direction = DIRECTION_NAMES[state.direction]
+    session.light_percentage = state.light
+    session.energy_percentage = state.energy
+    session.time = state.time
+    session.map_count = state.map_count
+    session.inventory["FOOD"] = state.food
+    session.inventory["MAP"] = state.maps
+    session.enemy_tick = state.enemy_tick
+    return session
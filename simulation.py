@@ -0,0 +1,661 @@
+import random
+
+import numpy as np
+
+from cave import rearrange_gates, make_rng, GoalPaths
+from grid import cells_of, first_cell_of
+from levels import (
+    LEVELS, STREAMING_LEVELS, LEVEL_PRESETS, generate_level_cave, make_level_world, pick_seed,
+)
+from enemies import EnemyPool, ENEMY_IDLE, ENEMY_NEAR, ENEMY_FAR
+from pathfinding import FlowField
+from collision import SolidMask
+from profiler import NO_PROFILER
+
+# ======================
+# TILE CONSTANTS
+# ======================
+
+WALL = 1
+FLOOR = 0
+EXIT = 2
+MAP = 3
+FOOD = 4
+LIGHT = 5
+GATE_CLOSED = 6
+GATE_OPEN = 7
+
+# ======================
+# WORLD
+# ======================
+
+BASE_CELL_SIZE = 128  # world pixels per cave cell
+
+# ======================
+# MOVEMENT
+# ======================
+
+MAX_MOVE_SPEED = 500
+MIN_MOVE_SPEED = 0
+
+# ======================
+# LIGHT
+# ======================
+
+MAX_LIGHT = 100
+MIN_LIGHT = 10
+LIGHT_DRAIN_PER_SEC = 0.85
+
+# ======================
+# ENERGY
+# ======================
+
+MAX_ENERGY = 100
+MIN_ENERGY = 0
+ENERGY_DRAIN_PER_SEC = 0.6
+
+# ======================
+# ENEMIES
+# ======================
+ENEMY_SPEED = 100  # pixels per second
+ENEMY_TRIGGER_LIGHT = 20  # light % at which enemies start moving
+ENEMY_ACTIVE_RADIUS = 8   # cells around the player where enemies update every step
+FAR_ENEMY_UPDATE_EVERY = 4  # farther enemies update once every this many steps
+ENEMY_BUCKET_CELLS = 4    # spatial hash bucket size, in cells
+
+# ======================
+# ANIMATION
+# ======================
+
+FRAMES = 4
+ANIM_SPEED = 0.15
+
+# Movement input understood by GameSession.step
+DIRECTIONS = {
+    "left": (-1, 0),
+    "right": (1, 0),
+    "up": (0, -1),
+    "down": (0, 1),
+}
+
+
+def spawn_enemies(cave, count, cell_size=BASE_CELL_SIZE, rng=None):
+    """
+    Place count enemies on distinct random floor cells.
+    Returns an EnemyPool.
+    """
+    rng = make_rng(rng=rng)
+    floor_cells = cells_of(cave, FLOOR)
+    chosen = rng.sample(floor_cells, min(count, len(floor_cells)))
+    return EnemyPool.from_cells(chosen, cell_size)
+
+
+# ======================
+# GAME SESSION
+# ======================
+
+class GameSession:
+    """
+    All gameplay state of one run and its update logic, without any
+    rendering, sound or window. The game loop (or a headless runner) feeds
+    it time and input through step().
+
+    state is "PLAYING", "WIN" or "GAMEOVER". events collects what happened
+    during the last step (e.g. "reward") so the caller can play sounds.
+    """
+
+    def __init__(self, cave, spawn, enemies, cell_size=BASE_CELL_SIZE, rng=None, seed=None,
+                 level=None):
+        self.cave = cave
+        self.cell_size = cell_size
+        self.seed = seed                  # seed the cave was generated from, if known
+        self.level = level                # level preset name, if known
+        self.rng = make_rng(rng=rng)      # used for gate shuffles
+        self.rows, self.cols = cave.shape
+
+        cx, cy = spawn
+        self.player_x = cx * cell_size + cell_size // 2
+        self.player_y = cy * cell_size + cell_size // 2
+        self.player_radius = cell_size // 4
+        self.player_direction = "down"
+        self.animation_frame = 0
+        self.animation_timer = 0
+
+        self.light_percentage = MAX_LIGHT
+        self.energy_percentage = MAX_ENERGY
+        self.map_count = 0  # Number of times player can open the map after collecting MAP
+        self.inventory = {
+            "FOOD": 0,
+            "MAP": 0
+        }
+        self.enemies = enemies  # EnemyPool
+        self.enemies.index(ENEMY_BUCKET_CELLS * cell_size)
+        self.enemy_tick = 0
+        self.flow = FlowField(cave)  # chase directions toward the player's cell
+        self.solid = SolidMask(cave, cell_size)  # walls and closed gates, for movement
+        self._find_gates()
+
+        self.state = "PLAYING"
+        self.events = []
+        self.changed_cells = []   # (x, y) cells whose tile changed; the caller empties it
+        self.time = 0.0
+        self.profiler = NO_PROFILER  # FrameProfiler timing the phases of step
+
+    # ----------------
+    # HELPERS
+    # ----------------
+
+    def can_move_pixel(self, x, y):
+        r = self.player_radius
+        cs = self.cell_size
+        for ox in (-r, r):
+            for oy in (-r, r):
+                if self.solid.is_solid(int((x + ox) // cs), int((y + oy) // cs)):
+                    return False
+        return True
+
+    def player_cell(self):
+        return (int(self.player_x // self.cell_size), int(self.player_y // self.cell_size))
+
+    def _find_gates(self):
+        # Gates only ever toggle and the exit only goes when it is reached,
+        # so both are found once per cave instead of at every shuffle
+        self.gates = cells_of(self.cave, GATE_CLOSED, GATE_OPEN)
+        self.exit_cell = first_cell_of(self.cave, EXIT)
+        self.goal_paths = None   # GoalPaths to gate_goal(), made at the first shuffle
+
+    # ----------------
+    # ACTIONS
+    # ----------------
+
+    def use_map(self):
+        """
+        Spend one map from the inventory. Returns True if one was available.
+        """
+        if self.inventory["MAP"] <= 0:
+            return False
+        self.inventory["MAP"] -= 1
+        self.map_count = max(0, self.map_count - 1)
+        return True
+
+    def shuffle_gates(self):
+        """
+        Reshuffle the gates (done when the map is closed), keeping a path
+        from the player to the exit open.
+        """
+        goal = self.gate_goal()
+        if goal:
+            if self.goal_paths is None or self.goal_paths.goal != goal:
+                self.goal_paths = GoalPaths(self.cave, goal)
+            changed = rearrange_gates(self.cave, self.player_cell(), goal, open_ratio=0.5,
+                                      rng=self.rng, gates=self.gates, paths=self.goal_paths)
+            self.solid.update_cells(changed)
+            self.flow.update_cells(changed)
+            self.changed_cells.extend(changed)
+
+    def gate_goal(self):
+        """
+        Cell that must stay reachable when gates are shuffled.
+        """
+        return self.exit_cell
+
+    def trade(self, option):
+        """
+        Apply one of the trade options (FOOD_ENERGY, FOOD_LIGHT, FOOD_MAP,
+        MAP_ENERGY, MAP_LIGHT). Returns True if the trade happened.
+        """
+        if option.startswith("FOOD"):
+            if self.inventory["FOOD"] <= 0:
+                return False
+            self.inventory["FOOD"] -= 1
+        elif option.startswith("MAP"):
+            if self.inventory["MAP"] <= 0:
+                return False
+            self.inventory["MAP"] -= 1
+            self.map_count = max(0, self.map_count - 1)
+        else:
+            return False
+
+        if option.endswith("ENERGY"):
+            self.energy_percentage = min(MAX_ENERGY, self.energy_percentage + 50)
+        elif option.endswith("LIGHT"):
+            self.light_percentage = min(MAX_LIGHT, self.light_percentage + 50)
+        elif option == "FOOD_MAP":
+            self.inventory["MAP"] += 1
+            self.map_count += 1
+        return True
+
+    # ----------------
+    # UPDATE
+    # ----------------
+
+    def step(self, dt, move=None):
+        """
+        Advance the simulation by dt seconds. move is one of DIRECTIONS
+        (or None to stand still).
+        """
+        self.events = []
+        if self.state != "PLAYING":
+            return self.state
+        self.time += dt
+        profiler = self.profiler
+
+        with profiler.phase("movement"):
+            self._move_player(dt, move)
+
+            # Decrease light and energy
+            self.light_percentage = max(MIN_LIGHT, self.light_percentage - LIGHT_DRAIN_PER_SEC * dt)
+            self.energy_percentage = max(MIN_ENERGY, self.energy_percentage - ENERGY_DRAIN_PER_SEC * dt)
+            if self.energy_percentage <= 0:
+                self.state = "GAMEOVER"
+
+        with profiler.phase("items"):
+            self._collect_item()
+        with profiler.phase("enemies"):
+            self._update_enemies(dt)
+        return self.state
+
+    def _move_player(self, dt, move):
+        speed = MIN_MOVE_SPEED + (MAX_MOVE_SPEED - MIN_MOVE_SPEED) * (self.energy_percentage / 100)
+
+        dx = dy = 0
+        if move in DIRECTIONS:
+            ux, uy = DIRECTIONS[move]
+            dx, dy = ux * speed * dt, uy * speed * dt
+            self.player_direction = move
+
+        self.player_x, self.player_y = self.solid.move(
+            self.player_x, self.player_y, dx, dy, self.player_radius)
+
+        if move in DIRECTIONS:
+            self.animation_timer += dt
+            if self.animation_timer >= ANIM_SPEED:
+                self.animation_timer = 0
+                self.animation_frame = (self.animation_frame + 1) % FRAMES
+        else:
+            self.animation_frame = 0
+
+    def _collect_item(self):
+        px_cell, py_cell = self.player_cell()
+        item = self.cave[py_cell, px_cell]
+        if item not in (LIGHT, FOOD, MAP, EXIT):
+            return
+
+        self.events.append("reward")
+        self.cave[py_cell, px_cell] = FLOOR  # Remove the item from the cave
+        self.flow.update_cells([(px_cell, py_cell)])
+        self.changed_cells.append((px_cell, py_cell))
+
+        if item == EXIT:
+            self.exit_cell = None
+            self.state = "WIN"
+        elif item == LIGHT:
+            self.light_percentage = min(MAX_LIGHT, self.light_percentage + 50)
+        elif item == FOOD:
+            if self.energy_percentage > 50:
+                # Store in inventory
+                self.inventory["FOOD"] += 1
+            else:
+                # Consume immediately
+                self.energy_percentage = min(MAX_ENERGY, self.energy_percentage + 50)
+        elif item == MAP:
+            if self.energy_percentage > 50:
+                self.inventory["MAP"] += 1
+                self.map_count += 1
+            else:
+                self.map_count += 10
+
+    def _update_enemies(self, dt):
+        enemies = self.enemies
+        if self.light_percentage < ENEMY_TRIGGER_LIGHT:
+            enemies.state[:] = ENEMY_IDLE
+            return
+
+        # Enemies within ENEMY_ACTIVE_RADIUS cells of the player move every
+        # step; the rest are split into FAR_ENEMY_UPDATE_EVERY groups and
+        # each group moves once every that many steps with the time it
+        # skipped, so they keep the same speed.
+        self.enemy_tick += 1
+        px_cell, py_cell = self.player_cell()
+        cells = (ENEMY_ACTIVE_RADIUS + 1) * self.cell_size
+        near = enemies.near(self.player_x, self.player_y, cells)
+        ex_cell = np.floor_divide(enemies.x[near], self.cell_size)
+        ey_cell = np.floor_divide(enemies.y[near], self.cell_size)
+        near = near[(np.abs(ex_cell - px_cell) <= ENEMY_ACTIVE_RADIUS)
+                    & (np.abs(ey_cell - py_cell) <= ENEMY_ACTIVE_RADIUS)]
+
+        every = FAR_ENEMY_UPDATE_EVERY
+        far_turn = slice(self.enemy_tick % every, None, every)
+
+        enemies.state[:] = ENEMY_IDLE
+        enemies.state[far_turn] = ENEMY_FAR
+        enemies.state[near] = ENEMY_NEAR
+        step_dt = np.zeros(len(enemies))
+        step_dt[far_turn] = dt * every
+        step_dt[near] = dt
+
+        # Follow the flow field around walls; enemies in the player's cell
+        # (or cut off from it) head straight for the player.
+        self.flow.update((px_cell, py_cell))
+        target_x, target_y = self.flow.steer_targets(
+            enemies.x, enemies.y, self.cell_size, self.player_x, self.player_y)
+        enemies.chase(target_x, target_y, ENEMY_SPEED, step_dt, self.solid, self.player_radius)
+
+        # Collision with player: only enemies in the buckets around them
+        if enemies.touching(self.player_x, self.player_y, self.player_radius):
+            self.state = "GAMEOVER"
+
+
+class StreamingSession(GameSession):
+    """
+    A GameSession on a ChunkWorld. The cave is a window of span x span
+    chunks (origin is its top-left chunk) kept centred on the player: once
+    the player is a little way out of the middle chunk the window moves by
+    a chunk.
+    The cave array is refilled in place, everything in it is shifted to
+    the new window coordinates and "recenter" is added to events, so the
+    caller can redraw anything built from the old contents.
+    """
+
+    def __init__(self, world, origin, span, cave, spawn, enemies, cell_size=BASE_CELL_SIZE,
+                 rng=None, seed=None, level=None):
+        super().__init__(cave, spawn, enemies, cell_size, rng=rng, seed=seed, level=level)
+        self.world = world
+        self.origin = origin
+        self.span = span
+
+    def step(self, dt, move=None):
+        super().step(dt, move)
+        if self.state == "PLAYING":
+            with self.profiler.phase("streaming"):
+                self._follow_player()
+                self.world.prefetch(self.origin, self.span)
+        return self.state
+
+    def _follow_player(self):
+        size = self.world.size
+        px_cell, py_cell = self.player_cell()
+        middle = self.span // 2
+        # Only move once the player is a little way into the next chunk, so
+        # walking back and forth over a chunk edge does not keep moving it.
+        margin = size // 4
+        low, high = middle * size - margin, (middle + 1) * size + margin
+        if low <= px_cell < high and low <= py_cell < high:
+            return
+        dx = px_cell // size - middle
+        dy = py_cell // size - middle
+
+        self.world.store(self.origin, self.span, self.cave)
+        self.origin = (self.origin[0] + dx, self.origin[1] + dy)
+        self.cave[:] = self.world.window(self.origin, self.span)
+        self.solid.refresh()
+        self.flow.invalidate()
+        self._find_gates()
+        self.changed_cells.clear()   # every cell changed; see "recenter"
+
+        shift_x = -dx * size * self.cell_size
+        shift_y = -dy * size * self.cell_size
+        self.player_x += shift_x
+        self.player_y += shift_y
+        self._shift_enemies(shift_x, shift_y, dx, dy)
+        self.enemies.reindex()
+        self.events.append("recenter")
+
+    def _shift_enemies(self, shift_x, shift_y, dx, dy):
+        """
+        Move enemies with the window. Those that fell off it come back on
+        floor cells of the chunks that were just loaded.
+        """
+        enemies = self.enemies
+        enemies.x += shift_x
+        enemies.y += shift_y
+        width = self.cols * self.cell_size
+        height = self.rows * self.cell_size
+        lost = np.flatnonzero((enemies.x < 0) | (enemies.x >= width)
+                              | (enemies.y < 0) | (enemies.y >= height))
+        if lost.size == 0:
+            return
+
+        # Chunks of the new window that were not in the old one
+        span, size = self.span, self.world.size
+        chunk_ix = np.arange(span)
+        new_cols = (chunk_ix + dx < 0) | (chunk_ix + dx >= span)
+        new_rows = (chunk_ix + dy < 0) | (chunk_ix + dy >= span)
+        fresh = np.repeat(np.repeat(new_rows[:, None] | new_cols[None, :], size, axis=0), size, axis=1)
+
+        ys, xs = np.nonzero(fresh & (self.cave == FLOOR))
+        if xs.size == 0:
+            return
+        picks = [self.rng.randrange(xs.size) for _ in range(lost.size)]
+        half = self.cell_size // 2
+        enemies.x[lost] = xs[picks] * self.cell_size + half
+        enemies.y[lost] = ys[picks] * self.cell_size + half
+
+    def gate_goal(self):
+        """
+        The exit when it is in the window, else a door on the window edge
+        facing the exit chunk, so the way on never gets shut.
+        """
+        if self.exit_cell:
+            return self.exit_cell
+
+        middle = self.span // 2
+        ex, ey = self.world.exit_chunk
+        dx = ex - (self.origin[0] + middle)
+        dy = ey - (self.origin[1] + middle)
+        # Door on the side the exit is mostly toward, at the end nearest it
+        if abs(dx) >= abs(dy):
+            column = 0 if dx < 0 else self.cols - 1
+            rows = np.flatnonzero(self.cave[:, column] != WALL)
+            return (column, int(rows[0] if dy < 0 else rows[-1])) if rows.size else None
+        row = 0 if dy < 0 else self.rows - 1
+        cols = np.flatnonzero(self.cave[row, :] != WALL)
+        return (int(cols[0] if dx < 0 else cols[-1]), row) if cols.size else None
+
+
+# ======================
+# FIXED TIMESTEP
+# ======================
+
+TICK_RATE = 30            # simulation steps per second
+MAX_CATCH_UP_STEPS = 5    # steps per frame at most; time beyond that is dropped
+
+
+class FixedStepper:
+    """
+    Drives a session with fixed steps of 1 / tick_rate seconds from
+    variable frame times, so gameplay does not depend on the frame rate and
+    costs the same per second however fast frames are drawn.
+
+    Frame time is accumulated and spent in whole steps, at most max_steps
+    per frame (after a longer stall the game slows down for a moment
+    instead of running ever more steps to catch up). Positions before the
+    last step are kept, and alpha says how far the leftover time reaches
+    into the next one, so drawing can interpolate between the two.
+    """
+
+    def __init__(self, session, tick_rate=TICK_RATE, max_steps=MAX_CATCH_UP_STEPS):
+        self.session = session
+        self.step_dt = 1 / tick_rate
+        self.max_steps = max_steps
+        self.accumulator = 0.0
+        self.alpha = 1.0
+        self.events = []    # events of every step run by the last advance
+        self.prev_x = self.prev_y = 0.0
+        self.prev_enemy_x = session.enemies.x.copy()
+        self.prev_enemy_y = session.enemies.y.copy()
+        self._keep_positions()
+
+    def _keep_positions(self):
+        session = self.session
+        self.prev_x, self.prev_y = session.player_x, session.player_y
+        np.copyto(self.prev_enemy_x, session.enemies.x)
+        np.copyto(self.prev_enemy_y, session.enemies.y)
+
+    def advance(self, frame_dt, move=None):
+        """
+        Run as many steps as frame_dt seconds (plus what was left over)
+        pay for, holding move for all of them. Returns the session state.
+        """
+        session = self.session
+        self.events = []
+        self.accumulator += frame_dt
+        steps = 0
+        while (self.accumulator >= self.step_dt and steps < self.max_steps
+               and session.state == "PLAYING"):
+            self._keep_positions()
+            session.step(self.step_dt, move)
+            self.events.extend(session.events)
+            if "recenter" in session.events:
+                self._keep_positions()   # everything moved; do not blend across
+            self.accumulator -= self.step_dt
+            steps += 1
+
+        if steps == self.max_steps:
+            self.accumulator = min(self.accumulator, self.step_dt)
+        self.alpha = min(1.0, self.accumulator / self.step_dt)
+        return session.state
+
+    def player_position(self):
+        """
+        The player position to draw this frame.
+        """
+        a = self.alpha
+        session = self.session
+        return (self.prev_x + (session.player_x - self.prev_x) * a,
+                self.prev_y + (session.player_y - self.prev_y) * a)
+
+    def enemy_positions(self):
+        """
+        Enemy x and y arrays to draw this frame.
+        """
+        a = self.alpha
+        enemies = self.session.enemies
+        return (self.prev_enemy_x + (enemies.x - self.prev_enemy_x) * a,
+                self.prev_enemy_y + (enemies.y - self.prev_enemy_y) * a)
+
+
+def session_rngs(seed):
+    """
+    Independent random sources for enemy spawning and gameplay derived
+    from a cave seed, so a whole run is reproducible from one number.
+    """
+    return random.Random(f"{seed}:enemies"), random.Random(f"{seed}:play")
+
+
+def generate_level(level, seed, cache=None):
+    """
+    The slow part of starting a game of a level preset, as plain data that
+    can be handed between processes: (cave, spawn, exit). For streaming
+    levels cave is the starting window of chunks (and exit None unless it
+    lies in it). cache is an optional CaveCache (only used by levels
+    with a fixed SEED, and not by streaming levels).
+    """
+    if level in STREAMING_LEVELS:
+        world = make_level_world(level, seed)
+        span = LEVEL_PRESETS[level]["VIEW_CHUNKS"]
+        cave = world.window(_start_origin(span), span)
+        spawn = ((span // 2) * world.size + 1, (span // 2) * world.size + 1)
+    else:
+        cave, spawn = generate_level_cave(level, seed, cache)
+    return cave, spawn, first_cell_of(cave, EXIT)
+
+
+def _start_origin(span):
+    # Chunk (0, 0) in the middle of the window
+    return (-(span // 2), -(span // 2))
+
+
+def start_session(level, seed, cave, spawn, cell_size=BASE_CELL_SIZE):
+    """
+    Start a session of a level preset on a cave made by generate_level for
+    the same level and seed: spawn the enemies and, for streaming levels,
+    set up the ChunkWorld around the window.
+    """
+    preset = LEVEL_PRESETS[level]
+    enemy_rng, play_rng = session_rngs(seed)
+    enemies = spawn_enemies(cave, preset["ENEMY_COUNT"], cell_size, rng=enemy_rng)
+    if level not in STREAMING_LEVELS:
+        return GameSession(cave, spawn, enemies, cell_size, rng=play_rng, seed=seed, level=level)
+
+    world = make_level_world(level, seed)
+    span = preset["VIEW_CHUNKS"]
+    origin = _start_origin(span)
+    world.adopt(origin, span, cave)
+    return StreamingSession(world, origin, span, cave, spawn, enemies, cell_size,
+                            rng=play_rng, seed=seed, level=level)
+
+
+def new_session(level, seed=None, cell_size=BASE_CELL_SIZE, cache=None):
+    """
+    Generate a cave for the level preset and start a session on it.
+    seed defaults to the preset seed (or a fresh random one).
+    """
+    if seed is None:
+        seed = pick_seed(level)
+    cave, spawn, _ = generate_level(level, seed, cache)
+    return start_session(level, seed, cave, spawn, cell_size)
+
+
+# ======================
+# HEADLESS RUNNER
+# ======================
+
+def random_walk_policy(change_every=1.0, rng=None):
+    """
+    Simple input policy: walk in a random direction, picking a new one
+    every change_every seconds.
+    """
+    rng = make_rng(rng=rng)
+    state = {"move": None, "timer": 0.0}
+
+    def policy(session, dt):
+        state["timer"] -= dt
+        if state["timer"] <= 0:
+            state["move"] = rng.choice(list(DIRECTIONS))
+            state["timer"] = change_every
+        return state["move"]
+
+    return policy
+
+
+def run_session(session, policy, dt=1 / 60, max_time=600.0):
+    """
+    Step session with a fixed timestep until it ends or max_time passes.
+    Returns the final state ("WIN", "GAMEOVER" or "PLAYING" on timeout).
+    """
+    while session.state == "PLAYING" and session.time < max_time:
+        session.step(dt, policy(session, dt))
+    return session.state
+
+
+def run_headless(level, sessions, dt=1 / 60, max_time=600.0, first_seed=0,
+                 policy_factory=random_walk_policy):
+    """
+    Play many sessions of a level without a window and tally the outcomes.
+    Session i uses seed first_seed + i, so a batch is reproducible.
+    """
+    results = {"WIN": 0, "GAMEOVER": 0, "PLAYING": 0}
+    for seed in range(first_seed, first_seed + sessions):
+        session = new_session(level, seed)
+        policy = policy_factory(rng=random.Random(f"{seed}:policy"))
+        results[run_session(session, policy, dt, max_time)] += 1
+    return results
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Run game sessions without a window.")
+    parser.add_argument("--level", choices=LEVELS + STREAMING_LEVELS, default=LEVELS[0])
+    parser.add_argument("--sessions", type=int, default=100)
+    parser.add_argument("--max-time", type=float, default=600.0, help="simulated seconds per session")
+    parser.add_argument("--tick", type=float, default=60.0, help="simulation steps per second")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first session")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    results = run_headless(args.level, args.sessions, 1 / args.tick, args.max_time, args.seed)
+    elapsed = time.perf_counter() - start
+    print(f"{args.level}: {results} in {elapsed:.2f}s ({args.sessions / elapsed:.1f} sessions/s)")
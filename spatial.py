@@ -0,0 +1,56 @@
+# ----------------------
+# Uniform grid spatial hash
+# ----------------------
+# Objects (by id) are kept in square buckets of bucket_size world units,
+# so "what is near this point" only looks at a few buckets instead of
+# every object. Moving an object is O(1) and only touches the hash when it
+# crosses into another bucket.
+
+
+class SpatialHash:
+    def __init__(self, bucket_size):
+        self.bucket_size = bucket_size
+        self.buckets = {}   # (bx, by) -> set of ids
+        self.keys = {}      # id -> (bx, by)
+
+    def _key(self, x, y):
+        return (int(x // self.bucket_size), int(y // self.bucket_size))
+
+    def __len__(self):
+        return len(self.keys)
+
+    def insert(self, obj_id, x, y):
+        key = self._key(x, y)
+        self.keys[obj_id] = key
+        self.buckets.setdefault(key, set()).add(obj_id)
+
+    def remove(self, obj_id):
+        key = self.keys.pop(obj_id)
+        bucket = self.buckets[key]
+        bucket.discard(obj_id)
+        if not bucket:
+            del self.buckets[key]
+
+    def move(self, obj_id, x, y):
+        key = self._key(x, y)
+        if self.keys.get(obj_id) != key:
+            if obj_id in self.keys:
+                self.remove(obj_id)
+            self.keys[obj_id] = key
+            self.buckets.setdefault(key, set()).add(obj_id)
+
+    def query(self, x, y, radius):
+        """
+        Return the ids in every bucket overlapping the square of half-size
+        radius around (x, y). This is a superset of the objects within
+        radius; callers do the exact test.
+        """
+        bx0, by0 = self._key(x - radius, y - radius)
+        bx1, by1 = self._key(x + radius, y + radius)
+        found = []
+        for by in range(by0, by1 + 1):
+            for bx in range(bx0, bx1 + 1):
+                bucket = self.buckets.get((bx, by))
+                if bucket:
+                    found.extend(bucket)
+        return found
@@ -0,0 +1,70 @@
+import random
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from cave import (  # noqa: E402
+    generate_cave, rearrange_gates, bfs_path, GoalPaths, WALL, EXIT, GATE_CLOSED, GATE_OPEN,
+)
+from grid import cells_of, first_cell_of  # noqa: E402
+from gridsearch import GridSearch, UNREACHED  # noqa: E402
+from simulation import new_session  # noqa: E402
+
+
+def reachable(cave, start, goal):
+    search = GridSearch(*cave.shape)
+    search.run(search.passable(cave, (WALL, GATE_CLOSED)), start)
+    return search.dist_grid()[goal[1], goal[0]] != UNREACHED
+
+
+def test_goal_paths_are_shortest_paths():
+    cave, spawn = generate_cave(41, 51, seed=4)
+    goal = first_cell_of(cave, EXIT)
+    paths = GoalPaths(cave, goal)
+    for start in cells_of(cave, 0)[::40] + [goal]:
+        path = paths.path(start)
+        assert path[0] == start and path[-1] == goal
+        assert len(path) == len(bfs_path(cave, start, goal))
+        assert all(cave[y, x] != WALL for x, y in path)
+
+
+def test_shuffle_with_gate_list_keeps_the_exit_open():
+    for seed in range(10):
+        cave, spawn = generate_cave(41, 51, num_gates=30, seed=seed)
+        goal = first_cell_of(cave, EXIT)
+        gates = cells_of(cave, GATE_CLOSED, GATE_OPEN)
+        paths = GoalPaths(cave, goal)
+        rng = random.Random(seed)
+        for _ in range(5):
+            before = cave.copy()
+            changed = rearrange_gates(cave, spawn, goal, rng=rng, gates=gates, paths=paths)
+            assert reachable(cave, spawn, goal)
+            assert cells_of(cave, GATE_CLOSED, GATE_OPEN) == gates
+            assert sorted(changed) == sorted(zip(*reversed((before != cave).nonzero())))
+
+
+def test_session_shuffles_keep_the_way_on_open():
+    for level in ("hard", "endless"):
+        session = new_session(level, 6)
+        rng = random.Random(0)
+        for step in range(300):
+            session.step(1 / 30, rng.choice(["left", "right", "up", "down"]))
+            if session.state != "PLAYING":
+                break
+            if step % 10:
+                continue
+            session.shuffle_gates()
+            assert session.gates == cells_of(session.cave, GATE_CLOSED, GATE_OPEN)
+            assert reachable(session.cave, session.player_cell(), session.gate_goal())
+
+
+def test_gate_list_follows_recenter():
+    session = new_session("endless", 3)
+    session.shuffle_gates()
+    session.player_x += (session.world.size + session.world.size // 4 + 1) * session.cell_size
+    session.step(1 / 60)
+    assert "recenter" in session.events
+    assert session.gates == cells_of(session.cave, GATE_CLOSED, GATE_OPEN)
+    session.shuffle_gates()
+    assert reachable(session.cave, session.player_cell(), session.gate_goal())
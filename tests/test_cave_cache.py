@@ -0,0 +1,35 @@
+import os
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from cave_cache import CaveCache  # noqa: E402
+from levels import LEVEL_PRESETS, generate_level_cave, pick_seed, use_kiosk_seeds  # noqa: E402
+
+
+def test_random_seed_levels_skip_the_cache(tmp_path):
+    cache = CaveCache(str(tmp_path / "caves"))
+    generate_level_cave("easy", pick_seed("easy"), cache)
+    assert not os.path.exists(cache.path)
+
+
+def test_kiosk_seeds_hit_the_cache(tmp_path, monkeypatch):
+    for preset in LEVEL_PRESETS.values():
+        monkeypatch.setitem(preset, "SEED", preset["SEED"])   # undone after the test
+    use_kiosk_seeds()
+    cache = CaveCache(str(tmp_path / "caves"))
+    seed = pick_seed("easy")
+    assert seed == LEVEL_PRESETS["easy"]["KIOSK_SEED"]
+
+    cave, spawn = generate_level_cave("easy", seed, cache)
+    assert len(os.listdir(cache.path)) == 2
+    cached, cached_spawn = generate_level_cave("easy", seed, cache)
+    assert np.array_equal(cached, cave) and cached_spawn == spawn
+
+    # The cached cave is copy-on-write: changing it leaves the file alone
+    cached[:] = 0
+    again, _ = generate_level_cave("easy", seed, cache)
+    assert np.array_equal(again, cave)
@@ -0,0 +1,29 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from gridsearch import GridSearch, UNREACHED  # noqa: E402
+from levels import make_level_world  # noqa: E402
+
+WALL = 1
+EXIT = 2
+GATE_CLOSED = 6
+
+
+def test_exit_reachable_from_every_door():
+    for seed in range(150):
+        world = make_level_world("endless", seed)
+        chunk = world.chunk(*world.exit_chunk)
+        (exit_y, exit_x), = np.argwhere(chunk == EXIT)
+
+        search = GridSearch(*chunk.shape)
+        search.run(search.passable(chunk, (WALL, GATE_CLOSED)), (int(exit_x), int(exit_y)))
+        dist = search.dist_grid()
+        edge = np.zeros(chunk.shape, dtype=bool)
+        edge[[0, -1], :] = edge[:, [0, -1]] = True
+        doors = edge & (chunk != WALL)
+        assert doors.any()
+        assert (dist[doors] != UNREACHED).all(), f"seed {seed}: exit shut in by gates"
@@ -0,0 +1,97 @@
+import random
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from collision import SolidMask, SKIN  # noqa: E402
+from simulation import new_session  # noqa: E402
+
+
+def assert_matches_cave(session, seed):
+    """
+    move and move_many on the session's mask agree with each other and
+    with a mask freshly built from the cave.
+    """
+    solid = session.solid
+    fresh = SolidMask(session.cave, session.cell_size)
+    assert bytes(solid.solid) == bytes(fresh.solid)
+    assert np.array_equal(solid.grid, fresh.grid)
+
+    rng = random.Random(seed)
+    cs, r = session.cell_size, session.player_radius
+    ys, xs = np.nonzero(session.cave != 1)
+    picks = [rng.randrange(len(xs)) for _ in range(500)]
+    px = xs[picks] * cs + cs / 2.0
+    py = ys[picks] * cs + cs / 2.0
+    dx = np.array([rng.uniform(-3 * cs, 3 * cs) for _ in picks])
+    dy = np.array([rng.uniform(-3 * cs, 3 * cs) for _ in picks])
+
+    many_x, many_y = solid.move_many(px, py, dx, dy, r)
+    for i in range(len(picks)):
+        expected = fresh.move(px[i], py[i], dx[i], dy[i], r)
+        assert solid.move(px[i], py[i], dx[i], dy[i], r) == expected
+        assert (many_x[i], many_y[i]) == expected
+
+
+def overlaps_solid(mask, x, y, r):
+    cs = mask.cell_size
+    return any(mask.is_solid(cx, cy)
+               for cx in range(int((x - r) // cs), int((x + r) // cs) + 1)
+               for cy in range(int((y - r) // cs), int((y + r) // cs) + 1))
+
+
+def test_fast_moves_stop_at_thin_walls():
+    cave = np.zeros((9, 20), dtype=np.uint8)
+    cave[:, 10] = 1          # one-cell wall
+    cave[4, 14] = 6          # closed gate in an open room
+    cave[6, 14] = 7          # open gate
+    cs, r = 32, 8
+    mask = SolidMask(cave, cs)
+
+    # Far more than a cell per step, in either direction, one box or many
+    x, y = 5 * cs + 16, 4 * cs + 16
+    assert mask.move(x, y, 40 * cs, 0, r)[0] < 10 * cs - r
+    assert mask.move(12 * cs + 16, y, -40 * cs, 0, r) == (11 * cs + r, y)
+    assert mask.move(x, 16, 0, 40 * cs, r) == (x, 9 * cs - r - SKIN)
+    xs, _ = mask.move_many(np.array([x, x]), np.array([y, y]),
+                           np.array([40.0 * cs, 3.0 * cs]), np.zeros(2), r)
+    assert xs[0] == mask.move(x, y, 40 * cs, 0, r)[0] and xs[1] == x + 3 * cs
+
+    # A closed gate stops a box, an open one does not
+    assert mask.move(12 * cs + 16, 4 * cs + 16, 5 * cs, 0, r)[0] < 14 * cs - r
+    assert mask.move(12 * cs + 16, 6 * cs + 16, 5 * cs, 0, r)[0] == 17 * cs + 16
+
+
+def test_session_steps_at_large_dt_never_enter_walls():
+    session = new_session("hard", 8)
+    rng = random.Random(3)
+    for _ in range(400):
+        session.step(rng.choice([0.05, 0.5, 2.0]), rng.choice(["left", "right", "up", "down"]))
+        session.state = "PLAYING"    # keep walking whatever happens
+        assert not overlaps_solid(session.solid, session.player_x, session.player_y,
+                                  session.player_radius)
+
+
+def test_mask_follows_gate_shuffles_and_pickups():
+    session = new_session("hard", 3)
+    rng = random.Random(5)
+    for n in range(20):
+        before = session.cave.copy()
+        session.shuffle_gates()
+        assert not np.array_equal(before, session.cave)
+        for _ in range(15):
+            session.step(1 / 30, rng.choice(["left", "right", "up", "down"]))
+            session.state = "PLAYING"
+        assert_matches_cave(session, n)
+
+
+def test_mask_follows_recenter():
+    session = new_session("endless", 3)
+    session.player_x += (session.world.size + session.world.size // 4 + 1) * session.cell_size
+    session.step(1 / 60)
+    assert "recenter" in session.events
+    session.shuffle_gates()
+    assert_matches_cave(session, 2)
@@ -0,0 +1,48 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from simulation import new_session  # noqa: E402
+
+
+def assert_buckets_match(enemies):
+    """
+    Every enemy is in the bucket of its position, and nowhere else.
+    """
+    buckets = enemies.buckets
+    assert len(buckets) == len(enemies)
+    for i, (x, y) in enumerate(zip(enemies.x.tolist(), enemies.y.tolist())):
+        key = buckets._key(x, y)
+        assert buckets.keys[i] == key
+        assert i in buckets.buckets[key]
+    assert sum(len(ids) for ids in buckets.buckets.values()) == len(enemies)
+
+
+def test_buckets_follow_chasing_enemies():
+    session = new_session("hard", 5)
+    for _ in range(90):
+        session.step(1 / 30, "right")
+    assert_buckets_match(session.enemies)
+
+
+def test_buckets_follow_recenter():
+    session = new_session("endless", 3)
+    session.player_x += (session.world.size + session.world.size // 4 + 1) * session.cell_size
+    session.step(1 / 60)
+    assert "recenter" in session.events
+    assert_buckets_match(session.enemies)
+
+
+def test_touching_matches_every_enemy():
+    enemies = new_session("hard", 5).enemies
+    rng = np.random.default_rng(0)
+    radius = 10
+    for x, y in rng.uniform(0, 1500, size=(300, 2)).tolist():
+        if rng.random() < 0.5:   # right next to an enemy
+            i = rng.integers(len(enemies))
+            x, y = enemies.x[i] + rng.uniform(-12, 12), enemies.y[i] + rng.uniform(-12, 12)
+        expected = bool(((np.abs(enemies.x - x) < radius) & (np.abs(enemies.y - y) < radius)).any())
+        assert enemies.touching(x, y, radius) == expected
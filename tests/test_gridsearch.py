@@ -0,0 +1,65 @@
+import random
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from cave import generate_cave, FLOOR, MAP, FOOD, LIGHT  # noqa: E402
+from grid import cells_of  # noqa: E402
+from gridsearch import GridSearch, UNREACHED, nearest_sources  # noqa: E402
+
+WALL = 1
+
+
+def per_source(cave, sources):
+    """
+    (labels, dist) worked out the slow way: one BFS per source, keeping
+    the nearest (the earliest source on ties).
+    """
+    search = GridSearch(*cave.shape)
+    passable = search.passable(cave, (WALL,))
+    dist = np.full(cave.shape, UNREACHED, dtype=np.int32)
+    labels = np.full(cave.shape, UNREACHED, dtype=np.int32)
+    for n, source in enumerate(sources):
+        search.run(passable, source)
+        d = search.dist_grid()
+        closer = (d != UNREACHED) & ((dist == UNREACHED) | (d < dist))
+        dist[closer] = d[closer]
+        labels[closer] = n
+    return labels, dist
+
+
+def test_nearest_sources_match_per_source_searches():
+    for seed in range(5):
+        cave, _ = generate_cave(31, 41, seed=seed)
+        rng = random.Random(seed)
+        sources = rng.sample(cells_of(cave, FLOOR), 12)
+        labels, dist = nearest_sources(cave, sources)
+        expected_labels, expected_dist = per_source(cave, sources)
+        assert np.array_equal(dist, expected_dist)
+        assert np.array_equal(labels, expected_labels)
+
+
+def test_nearest_sources_walls_and_duplicates():
+    cave = np.full((5, 7), FLOOR, dtype=np.uint8)
+    cave[:, 3] = WALL                  # splits the cave in two
+    labels, dist = nearest_sources(cave, [(0, 0), (0, 0), (6, 4)])
+    assert dist[0, 0] == 0 and labels[0, 0] == 0   # duplicate keeps the first
+    assert labels[4, 2] == 0 and dist[4, 2] == 6
+    assert labels[0, 4] == 2 and dist[0, 4] == 6
+    assert dist[2, 3] == UNREACHED and labels[2, 3] == UNREACHED
+
+
+def test_path_to_leads_back_to_the_nearest_source():
+    cave, _ = generate_cave(31, 41, seed=7)
+    items = cells_of(cave, MAP, FOOD, LIGHT)
+    search = GridSearch(*cave.shape)
+    search.run_many(search.passable(cave, (WALL,)), items)
+    labels, dist = search.label_grid(), search.dist_grid()
+    for x, y in cells_of(cave, FLOOR)[::25]:
+        path = search.path_to((x, y))
+        assert path[0] == items[labels[y, x]]
+        assert path[-1] == (x, y)
+        assert len(path) == dist[y, x] + 1
@@ -0,0 +1,31 @@
+import multiprocessing
+import os
+import signal
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from pregen import CavePregenerator  # noqa: E402
+
+
+@pytest.mark.skipif("fork" not in multiprocessing.get_all_start_methods(),
+                    reason="the worker process needs fork")
+def test_dead_worker_falls_back_to_a_thread():
+    pregen = CavePregenerator()
+    pregen.start()
+    try:
+        for pid in list(pregen.executor._processes):
+            os.kill(pid, signal.SIGKILL)
+        time.sleep(0.5)   # let the pool notice
+
+        pregen.prepare("easy")
+        assert pregen.take("easy").state == "PLAYING"
+        pregen.prepare("hard")
+        pregen.prepare("medium")
+        assert pregen.take("medium").level == "medium"
+    finally:
+        pregen.shutdown()
@@ -0,0 +1,44 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from savegame import HEADER, STATE, load_session, save_session  # noqa: E402
+from simulation import new_session  # noqa: E402
+
+
+@pytest.fixture
+def saved(tmp_path):
+    session = new_session("easy", 2)
+    session.step(0.5, "right")
+    path = tmp_path / "game.sav"
+    save_session(session, str(path))
+    return session, path
+
+
+def test_round_trip(saved):
+    session, path = saved
+    loaded = load_session(str(path))
+    assert (loaded.player_x, loaded.player_y) == (session.player_x, session.player_y)
+    assert (loaded.cave == session.cave).all()
+
+
+@pytest.mark.parametrize("keep", [0, 4, HEADER.size, HEADER.size + STATE.size - 1, -1])
+def test_truncated_file_is_a_value_error(saved, keep):
+    _, path = saved
+    data = path.read_bytes()
+    path.write_bytes(data[:keep] if keep >= 0 else data[:-1])
+    with pytest.raises(ValueError):
+        load_session(str(path))
+
+
+def test_bad_direction_is_a_value_error(saved):
+    _, path = saved
+    data = bytearray(path.read_bytes())
+    # player direction byte: after level (16), seed (8), sizes (12), position (16)
+    data[HEADER.size + 16 + 8 + 12 + 16] = 200
+    path.write_bytes(bytes(data))
+    with pytest.raises(ValueError):
+        load_session(str(path))
@@ -0,0 +1,72 @@
+import os
+import random
+import sys
+from pathlib import Path
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame  # noqa: E402
+import pytest  # noqa: E402
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from grid import cells_of  # noqa: E402
+from simulation import new_session, MAP, FOOD, LIGHT  # noqa: E402
+from tile_layer import TileLayer  # noqa: E402
+
+CELL = 16
+VIEW = (11 * CELL, 7 * CELL)
+
+
+@pytest.fixture(scope="module", autouse=True)
+def display():
+    pygame.display.init()
+    pygame.display.set_mode((1, 1))
+    yield
+    pygame.display.quit()
+
+
+def draw(layer, session, screen):
+    layer.draw(screen, int(session.player_x) - VIEW[0] // 2, int(session.player_y) - VIEW[1] // 2)
+
+
+def test_reported_cells_keep_chunks_up_to_date():
+    session = new_session("easy", 4, cell_size=CELL)
+    cave = session.cave
+
+    def draw_tile(surface, wx, wy, sx, sy):
+        surface.fill((int(cave[wy, wx]) * 30, wx % 256, wy % 256), (sx, sy, CELL, CELL))
+
+    layer = TileLayer(cave, CELL, draw_tile, VIEW)
+    screen = pygame.Surface(VIEW)
+    rng = random.Random(2)
+    reported = 0
+    for step in range(600):
+        if step % 50 == 0:
+            # Walk onto an item, so there are pickups to report
+            x, y = rng.choice(cells_of(cave, MAP, FOOD, LIGHT))
+            session.player_x, session.player_y = (x + 0.5) * CELL, (y + 0.5) * CELL
+            draw(layer, session, screen)   # the item's chunk is cached first
+            session.step(1 / 30)
+            assert "reward" in session.events
+        session.step(1 / 30, rng.choice(["left", "right", "up", "down"]))
+        session.state = "PLAYING"
+        if step % 40 == 0:
+            session.shuffle_gates()
+        reported += len(session.changed_cells)
+        layer.update_cells(session.changed_cells)
+        session.changed_cells.clear()
+        draw(layer, session, screen)
+        assert len(layer.chunks) <= layer.max_chunks
+
+    assert reported > 12
+    for (cx, cy), surface in layer.chunks.items():
+        fresh = layer._build_chunk(cx, cy)
+        assert pygame.image.tobytes(surface, "RGB") == pygame.image.tobytes(fresh, "RGB")
+
+
+def test_chunk_cache_is_sized_to_the_view():
+    session = new_session("hard", 1, cell_size=CELL)
+    layer = TileLayer(session.cave, CELL, lambda *args: None, VIEW)
+    chunk_px = layer.chunk_cells * CELL
+    assert layer.max_chunks == (VIEW[0] // chunk_px + 3) * (VIEW[1] // chunk_px + 3)
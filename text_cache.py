@@ -0,0 +1,53 @@
+from collections import OrderedDict
+
+import pygame
+
+# ----------------------
+# Text cache
+# ----------------------
+# Fonts are created once per (name, size) and shared, and rendered text is
+# kept and reused, so the many labels drawn every frame (buttons, bars,
+# legends) are rasterised only when they change. Rendered surfaces are
+# kept in least recently used order, up to MAX_TEXTS of them.
+# Fonts must be requested after pygame.init().
+
+MAX_TEXTS = 512
+
+_fonts = {}
+_texts = OrderedDict()
+
+
+def get_font(name, size):
+    """
+    Return the shared pygame.font.SysFont(name, size).
+    """
+    key = (name, size)
+    font = _fonts.get(key)
+    if font is None:
+        font = _fonts[key] = pygame.font.SysFont(name, size)
+    return font
+
+
+def render_text(font, text, color, antialias=True):
+    """
+    Return font.render(text, antialias, color), rendering it only if it is
+    not cached. The returned surface is shared, so do not draw on it.
+    """
+    key = (font, text, tuple(color), antialias)
+    surface = _texts.get(key)
+    if surface is not None:
+        _texts.move_to_end(key)
+        return surface
+
+    surface = font.render(text, antialias, color)
+    _texts[key] = surface
+    if len(_texts) > MAX_TEXTS:
+        _texts.popitem(last=False)
+    return surface
+
+
+def clear():
+    """
+    Drop all cached text (fonts are kept).
+    """
+    _texts.clear()
@@ -0,0 +1,111 @@
+from collections import OrderedDict
+
+import pygame
+
+# ----------------------
+# Static tile layer cache
+# ----------------------
+# The world is pre-rendered into chunk surfaces of CHUNK_CELLS x CHUNK_CELLS
+# tiles. Each frame only blits the chunks under the camera; tiles are
+# re-rendered only when the game reports their cell changed (item pickups,
+# gate shuffles) through update_cells. A full world surface would be far
+# too big on large levels (hard is 12800 x 12288 px), so chunks are built
+# lazily and only about a viewport's worth is kept: the chunks a view can
+# overlap plus one more row and column, so walking back and forth over a
+# chunk edge does not rebuild them.
+
+CHUNK_CELLS = 4
+
+
+class TileLayer:
+    def __init__(self, cave, cell_size, draw_tile, view_size, chunk_cells=CHUNK_CELLS):
+        """
+        draw_tile(surface, wx, wy, sx, sy) renders cave cell (wx, wy) onto
+        surface with its top-left corner at (sx, sy). view_size is the
+        (w, h) of the area the layer is drawn to.
+        """
+        self.cave = cave
+        self.cell_size = cell_size
+        self.draw_tile = draw_tile
+        self.chunk_cells = chunk_cells
+        chunk_px = chunk_cells * cell_size
+        view_w, view_h = view_size
+        self.max_chunks = (view_w // chunk_px + 3) * (view_h // chunk_px + 3)
+        self.rows, self.cols = cave.shape
+        self.chunks = OrderedDict()  # (chunk_x, chunk_y) -> Surface
+
+    # ----------------------
+    # Chunk building
+    # ----------------------
+    def _build_chunk(self, chunk_x, chunk_y):
+        n = self.chunk_cells
+        x0, y0 = chunk_x * n, chunk_y * n
+        x1, y1 = min(x0 + n, self.cols), min(y0 + n, self.rows)
+
+        surface = pygame.Surface(
+            ((x1 - x0) * self.cell_size, (y1 - y0) * self.cell_size)
+        ).convert()
+        for wy in range(y0, y1):
+            for wx in range(x0, x1):
+                self.draw_tile(surface, wx, wy,
+                               (wx - x0) * self.cell_size,
+                               (wy - y0) * self.cell_size)
+        return surface
+
+    def _get_chunk(self, chunk_x, chunk_y):
+        key = (chunk_x, chunk_y)
+        surface = self.chunks.get(key)
+        if surface is None:
+            surface = self._build_chunk(chunk_x, chunk_y)
+            self.chunks[key] = surface
+            if len(self.chunks) > self.max_chunks:
+                self.chunks.popitem(last=False)
+        else:
+            self.chunks.move_to_end(key)
+        return surface
+
+    # ----------------------
+    # Incremental updates
+    # ----------------------
+    def update_cells(self, cells):
+        """
+        Re-render the cells (x, y) whose tiles changed. Only chunks that
+        are currently cached are patched; the rest will be built from the
+        current cave when they come into view.
+        """
+        n = self.chunk_cells
+        for wx, wy in cells:
+            surface = self.chunks.get((wx // n, wy // n))
+            if surface is not None:
+                self.draw_tile(surface, wx, wy,
+                               (wx % n) * self.cell_size,
+                               (wy % n) * self.cell_size)
+
+    def invalidate(self):
+        """
+        Drop every cached chunk, e.g. after the cave was replaced wholesale.
+        """
+        self.chunks.clear()
+
+    # ----------------------
+    # Drawing
+    # ----------------------
+    def draw(self, screen, cam_x, cam_y):
+        """
+        Blit the part of the world under the camera onto screen.
+        """
+        chunk_px = self.chunk_cells * self.cell_size
+        view_w, view_h = screen.get_size()
+        world_w, world_h = self.cols * self.cell_size, self.rows * self.cell_size
+
+        first_x = max(0, cam_x) // chunk_px
+        first_y = max(0, cam_y) // chunk_px
+        last_x = (min(cam_x + view_w, world_w) - 1) // chunk_px
+        last_y = (min(cam_y + view_h, world_h) - 1) // chunk_px
+
+        for chunk_y in range(first_y, last_y + 1):
+            for chunk_x in range(first_x, last_x + 1):
+                screen.blit(
+                    self._get_chunk(chunk_x, chunk_y),
+                    (chunk_x * chunk_px - cam_x, chunk_y * chunk_px - cam_y)
+                )